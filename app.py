@@ -3,25 +3,27 @@ import asyncio
 import os
 import json
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import zipfile
 import io
 from pathlib import Path
 import sys
-import concurrent.futures
 import threading
 import time
 import platform
 import traceback
+import typing
 
 # Add the current directory to path to import our modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Import your existing modules
 try:
-    from core.fetch_matches import fetch_matches
-    from utils.user_agent_pool import get_random_user_agent
-    from core.utils import get_logger
+    from core.history_store import HistoryStore, DEFAULT_DB_PATH
+    from core.jsonl import to_jsonl
+    from core.job_queue import JobQueue
+    from core.export import export_run, csv_row
+    from core.events import Event, EventLog, format_event, stage_timings, JOB_FINISHED
 except ImportError as e:
     st.error(f"Error importing modules: {e}")
     st.stop()
@@ -31,196 +33,141 @@ if platform.system() == "Windows":
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
 
-def run_async_scraping(user_agent, log_container):
+def request_scrape():
     """
-    Runs the async scraping function in a way that's compatible with Streamlit's event loop
+    Ask the background worker (core.worker) for a scrape. Returns the new
+    job id (None when a scrape is already queued or running, so several
+    dashboard users never start duplicate scrapes) and whether a worker is
+    alive to run it.
     """
-    def scraping_thread():
-        # Create a new event loop for this thread
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        # Set Windows-specific event loop policy if needed
-        if platform.system() == "Windows":
-            asyncio.set_event_loop_policy(
-                asyncio.WindowsProactorEventLoopPolicy())
-
-        try:
-            return loop.run_until_complete(fetch_matches_with_logs(user_agent=user_agent, log_container=log_container))
-        except Exception as e:
-            raise Exception(
-                f"Scraping failed: {str(e)}\n{traceback.format_exc()}")
-        finally:
-            loop.close()
-
-    # Run the scraping in a separate thread to avoid event loop conflicts
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future = executor.submit(scraping_thread)
-        try:
-            return future.result(timeout=600)  # 10 minute timeout
-        except concurrent.futures.TimeoutError:
-            raise TimeoutError("Scraping operation timed out after 10 minutes")
-        except Exception as e:
-            raise Exception(
-                f"Thread execution failed: {str(e)}\n{traceback.format_exc()}")
-
-
-async def fetch_matches_with_logs(user_agent=None, log_container=None):
-    """
-    Modified fetch_matches that provides logging updates and fixes league categorization
-    """
-    def update_log(message):
-        if log_container:
-            current_time = datetime.now().strftime("%H:%M:%S")
-            log_container.append(f"[{current_time}] {message}")
-
-    tomorrow = datetime.utcnow().date() + timedelta(days=1)
-    date_str = tomorrow.strftime('%Y%m%d')
-
-    football_url = f"https://www.oddsportal.com/matches/football/{date_str}/"
-    basketball_url = f"https://www.oddsportal.com/matches/basketball/{date_str}/"
-    tennis_url = f"https://www.oddsportal.com/matches/tennis/{date_str}/"
-    futsal_url = f"https://www.oddsportal.com/matches/futsal/{date_str}/"
-    baseball_url = f"https://www.oddsportal.com/matches/baseball/{date_str}/"
-    nfl_url = "https://www.oddsportal.com/american-football/usa/nfl/"
-    ncaa_url = "https://www.oddsportal.com/american-football/usa/ncaa/"
-    wnba_url = "https://www.oddsportal.com/basketball/usa/wnba/"
-
-    all_matches = []
-
-    # Import the scraping functions
-    from core.fetch_matches import scrape_sport, scrape_nfl, scrape_ncaa, scrape_wnba
-
-    update_log("🚀 Starting scraping process...")
-    update_log(f"📅 Scraping matches for date: {date_str}")
-
-    # Scrape general sports with proper league names
-    sports_config = [
-        ("football", football_url, "Football"),
-        ("basketball", basketball_url, "Basketball"),
-        ("tennis", tennis_url, "Tennis"),
-        ("futsal", futsal_url, "Futsal"),
-        ("baseball", baseball_url, "Baseball"),
-    ]
-
-    for sport, url, display_name in sports_config:
-        try:
-            update_log(f"🔍 Scraping {display_name} matches...")
-            result = await scrape_sport_with_league_fix(sport, url, sport, display_name, user_agent=user_agent)
-            all_matches.extend(result)
-            update_log(f"✅ {display_name}: Found {len(result)} matches")
-            update_log(f"💾 Saved {display_name} data to files")
-        except Exception as e:
-            update_log(f"❌ {display_name}: Error during scraping - {str(e)}")
-
-    # Scrape specialized sports
-    specialized_sports = [
-        ("NFL", nfl_url, "nfl", scrape_nfl),
-        ("NCAA", ncaa_url, "ncaa", scrape_ncaa),
-        ("WNBA", wnba_url, "wnba", scrape_wnba),
-    ]
-
-    for name, url, folder, func in specialized_sports:
-        try:
-            update_log(f"🔍 Scraping {name} matches...")
-            result = await func(url, folder, user_agent=user_agent)
-            all_matches.extend(result)
-            update_log(f"✅ {name}: Found {len(result)} matches")
-            update_log(f"💾 Saved {name} data to files")
-        except Exception as e:
-            update_log(f"❌ {name}: Error during scraping - {str(e)}")
+    queue = JobQueue()
+    try:
+        return queue.enqueue("dashboard"), queue.worker_alive()
+    finally:
+        queue.close()
+
+
+def scrape_status():
+    """The pending job (if any), the worker's heartbeat row and whether it is alive."""
+    if not os.path.exists(DEFAULT_DB_PATH):
+        return None, None, False
+    queue = JobQueue()
+    try:
+        return queue.active(), queue.worker_status(), queue.worker_alive()
+    finally:
+        queue.close()
+
+
+def job_events(job_id):
+    """Progress events the worker published for a job (core.events)."""
+    if not os.path.exists(DEFAULT_DB_PATH):
+        return []
+    event_log = EventLog()
+    try:
+        return event_log.events(job_id)
+    finally:
+        event_log.close()
+
+
+def show_events(placeholder, events, lines=10):
+    """The last lines of an event stream, timed from its first event."""
+    started = datetime.fromisoformat(events[0].ts) if events else None
+    placeholder.code('\n'.join(format_event(e, started) for e in events[-lines:])
+                     or "Waiting for the first event...")
+
+
+def note(kind, message, placeholder):
+    """Record a dashboard-side event and redraw the log."""
+    st.session_state.events.append(Event(kind=kind, message=message))
+    show_events(placeholder, st.session_state.events)
+
+
+def show_job_progress(job_id):
+    """Live log and per-stage timings of a worker job; reloads the page once it finishes."""
+    events = job_events(job_id)
+    st.markdown(f"### 🖥️ Job {job_id} Progress")
+    show_events(st.empty(), events, lines=15)
+    timings = stage_timings(events)
+    if timings:
+        st.dataframe(pd.DataFrame([{
+            'Stage': kind,
+            'Count': stage['count'],
+            'Total (s)': round(stage['total_ms'] / 1000, 2),
+            'Slowest (s)': round(stage['max_ms'] / 1000, 2),
+        } for kind, stage in timings.items()]), hide_index=True)
+    if events and events[-1].kind == JOB_FINISHED and st.session_state.live_job == job_id:
+        st.session_state.live_job = None
+        st.rerun()
 
-    update_log(
-        f"🎉 Scraping completed! Total matches found: {len(all_matches)}")
-    return all_matches
 
+# Redraw the progress panel every few seconds where Streamlit supports it
+if hasattr(st, "fragment"):
+    show_job_progress = st.fragment(run_every=2)(show_job_progress)
 
-async def scrape_sport_with_league_fix(sport: str, url: str, output_subfolder: str, league_name: str, user_agent=None) -> list[dict]:
-    """
-    Modified scrape_sport function that sets the correct league name
-    """
-    matches = []
 
-    # Import required modules
-    from playwright.async_api import async_playwright
-    from core.utils import get_logger
+def sport_of(match):
+    return (match.get('sport') or 'unknown').lower()
 
-    log = get_logger()
-    output_dir = os.path.join("./output", output_subfolder)
-    os.makedirs(output_dir, exist_ok=True)
 
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        context = await browser.new_context(user_agent=user_agent)
-        page = await context.new_page()
+def matches_frame(matches, with_sport=False):
+    """The table shown in each sport tab and written to the CSV downloads."""
+    return pd.DataFrame([csv_row(match, with_sport) for match in matches])
 
-        await page.goto(url, timeout=60000)
-        await page.wait_for_timeout(5000)
 
-        await page.wait_for_selector('div[data-testid="game-row"]')
-        match_blocks = page.locator('div[data-testid="game-row"]')
+# The view layer below is cached per data version (a history run id, or a
+# token for sample data), so reruns from widget clicks reuse it instead of
+# regrouping and reserializing every match. Underscore arguments are not
+# hashed; the version alone keys the cache.
 
-        count = await match_blocks.count()
-        log.info(f"[{sport.upper()}] Found {count} match rows")
+@st.cache_data(show_spinner=False, max_entries=4)
+def build_views(version, _matches):
+    """Per-sport tables, stats and odds-movement labels for one data version."""
+    by_sport = {}
+    leagues = {}
+    for match in _matches:
+        by_sport.setdefault(sport_of(match), []).append(match)
+        league = match.get('league', 'Unknown')
+        leagues[league] = leagues.get(league, 0) + 1
+    return {
+        "total": len(_matches),
+        "frames": {sport: matches_frame(matches) for sport, matches in by_sport.items()},
+        "leagues": sorted(leagues.items(), key=lambda kv: -kv[1]),
+        "match_labels": {
+            f"{m.get('team1', '')} vs {m.get('team2', '')}": m.get('match_url', '')
+            for m in _matches
+        },
+    }
 
-        now = datetime.utcnow()
-        formatted_date = now.strftime('%Y%m%d')
 
-        for i in range(count):
-            try:
-                block = match_blocks.nth(i)
-
-                team_links = block.locator("a[title]")
-                if await team_links.count() < 2:
-                    continue
-
-                team1 = await team_links.nth(0).get_attribute("title")
-                team2 = await team_links.nth(1).get_attribute("title")
-
-                odds_tags = block.locator(
-                    'p[data-testid="odd-container-default"]')
-                odds = []
-                for j in range(await odds_tags.count()):
-                    val = await odds_tags.nth(j).inner_text()
-                    odds.append(val.strip())
-
-                match_datetime = now.replace(
-                    hour=0, minute=0, second=0) + timedelta(minutes=i * 5)
-
-                matches.append({
-                    "datetime": match_datetime.isoformat(),
-                    "league": league_name,  # Use the correct league name instead of "Unknown"
-                    "team1": team1,
-                    "team2": team2,
-                    "odds": odds[:3],
-                    "match_url": url
-                })
+@st.cache_data(show_spinner=False, max_entries=64)
+def download_payload(version, sport, fmt, _matches):
+    """One sport's (or with sport=None, every) match serialized as csv, json or jsonl."""
+    matches = _matches if sport is None else [m for m in _matches if sport_of(m) == sport]
+    if fmt == "csv":
+        return matches_frame(matches, with_sport=sport is None).to_csv(index=False)
+    if fmt == "json":
+        return json.dumps(matches, indent=2, ensure_ascii=False)
+    return to_jsonl(matches)
 
-            except Exception as e:
-                log.warning(
-                    f"[{sport.upper()}] Failed to parse match {i}: {e}")
-                continue
 
-        await context.close()
-        await browser.close()
+def supports_deferred_download():
+    """Whether st.download_button's data parameter accepts a callable."""
+    try:
+        hints = typing.get_type_hints(st.download_button)
+    except Exception:
+        return False
+    return "Callable" in str(hints.get("data", ""))
 
-        if matches:
-            df = pd.DataFrame(matches)
-            csv_path = os.path.join(
-                output_dir, f"{sport}_matches_{formatted_date}.csv")
-            json_path = os.path.join(
-                output_dir, f"{sport}_matches_{formatted_date}.json")
 
-            df.to_csv(csv_path, index=False)
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(matches, f, indent=4)
+# Checked up front: a failed call has already registered the button's key,
+# so it cannot be retried with other data
+DEFERRED_DOWNLOADS = supports_deferred_download()
 
-            log.info(f"[{sport.upper()}] Saved CSV to {csv_path}")
-            log.info(f"[{sport.upper()}] Saved JSON to {json_path}")
-        else:
-            log.warning(f"[{sport.upper()}] No matches scraped.")
 
-    return matches
+def lazy_download_button(label, build, file_name, mime, key):
+    """Download button whose payload is only built when it is clicked, where Streamlit allows it."""
+    return st.download_button(label=label, data=build if DEFERRED_DOWNLOADS else build(),
+                              file_name=file_name, mime=mime, key=key)
 
 
 def generate_sample_data():
@@ -244,6 +191,8 @@ def generate_sample_data():
         for i, (team1, team2) in enumerate(teams[sport]):
             sample_matches.append({
                 "datetime": (datetime.now() + timedelta(hours=i+1)).isoformat(),
+                "sport": sport.lower(),
+                "country": "",
                 "league": sport,
                 "team1": team1,
                 "team2": team2,
@@ -395,8 +344,34 @@ if 'last_scrape_time' not in st.session_state:
     st.session_state.last_scrape_time = None
 if 'last_error' not in st.session_state:
     st.session_state.last_error = None
-if 'terminal_logs' not in st.session_state:
-    st.session_state.terminal_logs = []
+if 'events' not in st.session_state:
+    st.session_state.events = []
+if 'live_job' not in st.session_state:
+    st.session_state.live_job = None
+if 'seen_run_id' not in st.session_state:
+    st.session_state.seen_run_id = None
+if 'data_version' not in st.session_state:
+    st.session_state.data_version = None
+
+# Scrapes run in the background worker (python -m core.worker) and land in
+# the history store; the dashboard only reads the latest finished run, and
+# reloads it whenever the worker has published a newer one
+if os.path.exists(DEFAULT_DB_PATH):
+    try:
+        history = HistoryStore()
+        last_run = next((r for r in history.runs(limit=5) if r["finished_at"]), None)
+        if last_run and last_run["id"] != st.session_state.seen_run_id:
+            latest = history.latest_matches()
+            st.session_state.seen_run_id = last_run["id"]
+            if latest:
+                st.session_state.scraped_data = latest
+                st.session_state.data_version = f"run-{last_run['id']}"
+                # finished_at is naive UTC; keep it aware so comparisons hold on any host zone
+                st.session_state.last_scrape_time = datetime.fromisoformat(
+                    last_run["finished_at"]).replace(tzinfo=timezone.utc)
+        history.close()
+    except Exception as e:
+        st.session_state.last_error = f"Could not load odds history: {e}"
 
 # Navbar
 st.markdown("""
@@ -453,14 +428,14 @@ with col1:
 
     # Scraping controls
     button_text = "🧪 Generate Sample Data" if test_mode else "🚀 Start Scraping"
-    button_help = "Generate sample data for testing" if test_mode else "Start live scraping from OddsPortal"
+    button_help = "Generate sample data for testing" if test_mode else "Ask the background worker to scrape OddsPortal now"
 
     if st.button(button_text, disabled=st.session_state.scraping_in_progress, help=button_help):
         st.session_state.scraping_in_progress = True
         st.session_state.last_error = None
-        st.session_state.terminal_logs = []
+        st.session_state.events = []
 
-        spinner_text = "🔄 Generating sample data..." if test_mode else "🔄 Scraping odds data with stealth mode..."
+        spinner_text = "🔄 Generating sample data..." if test_mode else "🔄 Queueing a scrape for the background worker..."
 
         with st.spinner(spinner_text):
             progress_bar = st.progress(0)
@@ -476,102 +451,50 @@ with col1:
                 if test_mode:
                     # Generate sample data for testing
                     status_text.text("Generating sample sports data...")
-                    st.session_state.terminal_logs.append(
-                        "[12:34:56] 🚀 Starting sample data generation...")
-                    log_display.code(
-                        '\n'.join(st.session_state.terminal_logs[-10:]))
+                    note("job_started", "🚀 Starting sample data generation...", log_display)
                     progress_bar.progress(30)
                     time.sleep(1)  # Simulate processing time
 
                     status_text.text("Creating mock matches...")
-                    st.session_state.terminal_logs.append(
-                        "[12:34:57] 📊 Creating mock matches for all sports...")
-                    log_display.code(
-                        '\n'.join(st.session_state.terminal_logs[-10:]))
+                    note("log", "📊 Creating mock matches for all sports...", log_display)
                     progress_bar.progress(60)
                     time.sleep(1)
 
                     matches = generate_sample_data()
                     progress_bar.progress(100)
                     status_text.text("✅ Sample data generated successfully!")
-                    st.session_state.terminal_logs.append(
-                        f"[12:34:58] ✅ Sample data generation completed! Generated {len(matches)} matches")
-                    log_display.code(
-                        '\n'.join(st.session_state.terminal_logs[-10:]))
+                    note("job_finished", f"✅ Sample data generation completed! Generated {len(matches)} matches",
+                         log_display)
+
+                    st.session_state.scraped_data = matches
+                    st.session_state.data_version = f"sample-{time.time_ns()}"
+                    st.session_state.last_scrape_time = datetime.now(timezone.utc)
+                    st.success(f"🎉 Successfully generated {len(matches)} sample matches!")
 
                 else:
-                    # Initialize logger
-                    logger = get_logger()
-
-                    # Get random user agent for stealth
-                    user_agent = get_random_user_agent()
-                    status_text.text(
-                        f"Using stealth user agent: {user_agent[:50]}...")
-                    st.session_state.terminal_logs.append(
-                        f"[{datetime.now().strftime('%H:%M:%S')}] 🔒 Using stealth user agent: {user_agent[:50]}...")
-                    log_display.code(
-                        '\n'.join(st.session_state.terminal_logs[-10:]))
-                    progress_bar.progress(10)
-
-                    # Check Playwright installation
-                    try:
-                        from playwright.async_api import async_playwright
-                        status_text.text(
-                            "Playwright detected, initializing...")
-                        st.session_state.terminal_logs.append(
-                            f"[{datetime.now().strftime('%H:%M:%S')}] ✅ Playwright detected, initializing browser...")
-                        log_display.code(
-                            '\n'.join(st.session_state.terminal_logs[-10:]))
-                        progress_bar.progress(20)
-                    except ImportError:
-                        raise ImportError(
-                            "Playwright is not installed. Please run: pip install playwright && playwright install")
-
-                    # Run the scraping with proper event loop handling
-                    status_text.text("Initializing browser and scraping...")
-                    st.session_state.terminal_logs.append(
-                        f"[{datetime.now().strftime('%H:%M:%S')}] 🌐 Initializing browser and starting scraping process...")
-                    log_display.code(
-                        '\n'.join(st.session_state.terminal_logs[-10:]))
-                    progress_bar.progress(40)
-
-                    # Create a container for live log updates
-                    class LogContainer:
-                        def __init__(self):
-                            self.logs = st.session_state.terminal_logs
-
-                        def append(self, message):
-                            self.logs.append(message)
-
-                    log_container = LogContainer()
-                    matches = run_async_scraping(user_agent, log_container)
-                    progress_bar.progress(80)
-
-                    status_text.text("Processing scraped data...")
-                    st.session_state.terminal_logs.append(
-                        f"[{datetime.now().strftime('%H:%M:%S')}] 📋 Processing and organizing scraped data...")
-                    log_display.code(
-                        '\n'.join(st.session_state.terminal_logs[-10:]))
-
-                # Store results
-                st.session_state.scraped_data = matches
-                st.session_state.last_scrape_time = datetime.now()
-
-                progress_bar.progress(100)
-                completion_text = "✅ Sample data ready!" if test_mode else "✅ Scraping completed successfully!"
-                status_text.text(completion_text)
-
-                success_text = f"🎉 Successfully generated {len(matches)} sample matches!" if test_mode else f"🎉 Successfully scraped {len(matches)} matches!"
-                st.success(success_text)
+                    # The worker does the scraping; the dashboard only queues it
+                    job_id, worker_alive = request_scrape()
+                    progress_bar.progress(100)
+                    if not worker_alive:
+                        st.warning("⚠️ No background worker is running, so queued scrapes will not start. "
+                                   "Start one with `python -m core.worker`.")
+                        note("error", "⚠️ No background worker running; the job waits until one starts",
+                             log_display)
+                    if job_id is None:
+                        st.info("⏳ A scrape is already queued or running; its results will show up here when it finishes.")
+                        note("log", "⏳ A scrape is already queued or running, not starting another",
+                             log_display)
+                    else:
+                        st.success(f"📨 Scrape job {job_id} queued. Results appear here once the worker finishes.")
+                        st.session_state.live_job = job_id
+                        note("log", f"📨 Queued scrape job {job_id} for the background worker",
+                             log_display)
 
             except Exception as e:
                 st.session_state.last_error = f"{str(e)}\n\nFull traceback:\n{traceback.format_exc()}"
                 error_msg = f"❌ Error during {'sample data generation' if test_mode else 'scraping'}: {str(e)}"
                 st.error(error_msg)
-                st.session_state.terminal_logs.append(
-                    f"[{datetime.now().strftime('%H:%M:%S')}] ❌ Error: {str(e)}\n{traceback.format_exc()}")
-                log_display.code(
-                    '\n'.join(st.session_state.terminal_logs[-10:]))
+                note("error", f"❌ Error: {str(e)}\n{traceback.format_exc()}", log_display)
 
                 # Show detailed error for debugging
                 with st.expander("🔍 Error Details"):
@@ -608,30 +531,41 @@ with col1:
                 progress_bar.empty()
                 status_text.empty()
 
+    # Background worker state, read from the shared store on every rerun
+    pending_job, worker, worker_alive = scrape_status()
+    if worker_alive:
+        next_run = f", next scheduled scrape at {worker['next_run_at'][:16].replace('T', ' ')} UTC" if worker["next_run_at"] else ""
+        st.caption(f"🟢 Worker {worker['state']} (pid {worker['pid']}){next_run}")
+    else:
+        st.caption("⚪ No background worker running. Start one with `python -m core.worker`.")
+    if pending_job:
+        st.caption(f"⏳ Job {pending_job['id']} {pending_job['status']} since "
+                   f"{(pending_job['started_at'] or pending_job['queued_at'])[:19].replace('T', ' ')} UTC")
+        # Follow the job live, straight from the events the worker publishes
+        st.session_state.live_job = pending_job['id']
+        show_job_progress(pending_job['id'])
+
 with col2:
     st.markdown("## 📈 Stats")
 
     if st.session_state.scraped_data:
-        total_matches = len(st.session_state.scraped_data)
-
-        # Group by league
-        leagues = {}
-        for match in st.session_state.scraped_data:
-            league = match.get('league', 'Unknown')
-            leagues[league] = leagues.get(league, 0) + 1
+        views = build_views(st.session_state.data_version, st.session_state.scraped_data)
+        leagues = views["leagues"]
 
         # Display stats
-        st.metric("Total Matches", total_matches)
-        st.metric("Sports Covered", len(leagues))
+        st.metric("Total Matches", views["total"])
+        st.metric("Sports Covered", len(views["frames"]))
 
         if st.session_state.last_scrape_time:
             st.metric("Last Scrape",
-                      st.session_state.last_scrape_time.strftime("%H:%M:%S"))
+                      st.session_state.last_scrape_time.astimezone().strftime("%H:%M:%S"))
 
         # League breakdown
         st.markdown("### League Breakdown")
-        for league, count in leagues.items():
+        for league, count in leagues[:15]:
             st.write(f"**{league}**: {count} matches")
+        if len(leagues) > 15:
+            st.caption(f"...and {len(leagues) - 15} more leagues")
     else:
         st.info("No data available. Run scraping first.")
 
@@ -646,136 +580,96 @@ if st.session_state.scraped_data:
     st.markdown("---")
     st.markdown("## 📁 Scraped Data & Downloads")
 
-    # Group matches by sport/league
-    sports_data = {}
-    for match in st.session_state.scraped_data:
-        sport = match.get('league', 'Unknown').lower()
-        if sport not in sports_data:
-            sports_data[sport] = []
-        sports_data[sport].append(match)
+    version = st.session_state.data_version
+    data = st.session_state.scraped_data
+    views = build_views(version, data)
+    stamp = (st.session_state.last_scrape_time or datetime.now(timezone.utc)).astimezone().strftime('%Y%m%d_%H%M')
 
-    # Create tabs for different sports
-    if sports_data:
-        tabs = st.tabs(list(sports_data.keys()))
+    # One tab per sport; leagues are a column within each tab
+    frames = views["frames"]
+    if frames:
+        tabs = st.tabs(list(frames.keys()))
 
-        for i, (sport, matches) in enumerate(sports_data.items()):
+        for i, (sport, df) in enumerate(frames.items()):
             with tabs[i]:
                 st.markdown(
-                    f"### {sport.upper()} Matches ({len(matches)} total)")
-
-                # Convert to DataFrame for display
-                df_data = []
-                for match in matches:
-                    df_data.append({
-                        'DateTime': match.get('datetime', ''),
-                        'Team 1': match.get('team1', ''),
-                        'Team 2': match.get('team2', ''),
-                        'Odds': ', '.join(match.get('odds', [])),
-                        'URL': match.get('match_url', '')
-                    })
-
-                df = pd.DataFrame(df_data)
+                    f"### {sport.upper()} Matches ({len(df)} total)")
                 st.dataframe(df, use_container_width=True)
 
-                # Download buttons for individual sports
-                col1, col2 = st.columns(2)
-
-                with col1:
-                    # CSV download
-                    csv_buffer = io.StringIO()
-                    df.to_csv(csv_buffer, index=False)
-                    st.download_button(
-                        label=f"📊 Download {sport.upper()} CSV",
-                        data=csv_buffer.getvalue(),
-                        file_name=f"{sport}_matches_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                        mime="text/csv"
-                    )
-
-                with col2:
-                    # JSON download
-                    json_data = json.dumps(
-                        matches, indent=2, ensure_ascii=False)
-                    st.download_button(
-                        label=f"📋 Download {sport.upper()} JSON",
-                        data=json_data,
-                        file_name=f"{sport}_matches_{datetime.now().strftime('%Y%m%d_%H%M')}.json",
-                        mime="application/json"
-                    )
+                # Payloads are serialized (once per version) only on click
+                for column, (fmt, icon, mime) in zip(st.columns(3), [
+                        ("csv", "📊", "text/csv"),
+                        ("json", "📋", "application/json"),
+                        ("jsonl", "🧾", "application/x-ndjson")]):
+                    with column:
+                        lazy_download_button(
+                            label=f"{icon} Download {sport.upper()} {fmt.upper()}",
+                            build=lambda sport=sport, fmt=fmt: download_payload(version, sport, fmt, data),
+                            file_name=f"{sport}_matches_{stamp}.{fmt}",
+                            mime=mime,
+                            key=f"download_{sport}_{fmt}")
+
+    # Odds movement from the history store
+    if os.path.exists(DEFAULT_DB_PATH):
+        with st.expander("📈 Odds Movement"):
+            match_labels = views["match_labels"]
+            selected = st.selectbox("Match", list(match_labels.keys()))
+            if selected:
+                history = HistoryStore()
+                movement = history.odds_history(match_labels[selected])
+                history.close()
+                if movement:
+                    st.dataframe(pd.DataFrame(movement), use_container_width=True)
+                else:
+                    st.info("No stored odds history for this match yet.")
 
     # Download All Files Section
     st.markdown("---")
     st.markdown("## 📦 Download All Files")
 
-    def create_zip_file():
-        """Create a zip file containing all CSV and JSON files"""
+    def create_zip_file(compress=True):
+        """In-memory ZIP of the cached payloads, for sample data (no run in the history store)."""
         zip_buffer = io.BytesIO()
+        compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+
+        with zipfile.ZipFile(zip_buffer, 'w', compression) as zip_file:
+            # Per-sport files, then the consolidated ones (sport=None)
+            for sport in list(frames) + [None]:
+                prefix = sport or "consolidated"
+                for fmt in ("csv", "json", "jsonl"):
+                    zip_file.writestr(f"{prefix}_matches_{stamp}.{fmt}",
+                                      download_payload(version, sport, fmt, data))
 
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M')
-
-            for sport, matches in sports_data.items():
-                # Create CSV
-                df_data = []
-                for match in matches:
-                    df_data.append({
-                        'DateTime': match.get('datetime', ''),
-                        'Team 1': match.get('team1', ''),
-                        'Team 2': match.get('team2', ''),
-                        'Odds': ', '.join(match.get('odds', [])),
-                        'URL': match.get('match_url', '')
-                    })
-
-                df = pd.DataFrame(df_data)
-
-                # Add CSV to zip
-                csv_buffer = io.StringIO()
-                df.to_csv(csv_buffer, index=False)
-                zip_file.writestr(
-                    f"{sport}_matches_{timestamp}.csv", csv_buffer.getvalue())
-
-                # Add JSON to zip
-                json_data = json.dumps(matches, indent=2, ensure_ascii=False)
-                zip_file.writestr(
-                    f"{sport}_matches_{timestamp}.json", json_data)
-
-            # Add consolidated file
-            all_matches_df = pd.DataFrame([
-                {
-                    'DateTime': match.get('datetime', ''),
-                    'League': match.get('league', ''),
-                    'Team 1': match.get('team1', ''),
-                    'Team 2': match.get('team2', ''),
-                    'Odds': ', '.join(match.get('odds', [])),
-                    'URL': match.get('match_url', '')
-                }
-                for match in st.session_state.scraped_data
-            ])
-
-            consolidated_csv = io.StringIO()
-            all_matches_df.to_csv(consolidated_csv, index=False)
-            zip_file.writestr(
-                f"consolidated_matches_{timestamp}.csv", consolidated_csv.getvalue())
-
-            consolidated_json = json.dumps(
-                st.session_state.scraped_data, indent=2, ensure_ascii=False)
-            zip_file.writestr(
-                f"consolidated_matches_{timestamp}.json", consolidated_json)
-
-        zip_buffer.seek(0)
         return zip_buffer.getvalue()
 
+    store_only = st.checkbox(
+        "⚡ Fast package (no compression)",
+        help="Store files without compressing them: quicker to build, larger to download")
+
     if st.button("📥 Prepare Download Package"):
         with st.spinner("Creating download package..."):
-            zip_data = create_zip_file()
+            # A scraped run's full card is streamed from the history store into
+            # an archive once per run id and mode; later clicks reuse it
+            build = None
+            if version and version.startswith("run-"):
+                archive = export_run(int(version.split("-", 1)[1]), compress=not store_only)
+                if archive:
+                    build = lambda: Path(archive).read_bytes()
+            else:
+                package = create_zip_file(compress=not store_only)
+                build = lambda: package
 
-            st.download_button(
-                label="⬇️ Download All Files (ZIP)",
-                data=zip_data,
-                file_name=f"oddsportal_scraper_data_{datetime.now().strftime('%Y%m%d_%H%M')}.zip",
-                mime="application/zip"
-            )
+            if build is None:
+                st.error("Could not package this run: it has no matches in the history store.")
+            else:
+                lazy_download_button(
+                    label="⬇️ Download All Files (ZIP)",
+                    build=build,
+                    file_name=f"oddsportal_scraper_data_{stamp}.zip",
+                    mime="application/zip",
+                    key="download_all_zip")
 
-            st.success("📦 Download package ready!")
+                st.success("📦 Download package ready!")
 
 # Information Section
 st.markdown("---")
@@ -877,7 +771,7 @@ Event Loop Policy: {type(asyncio.get_event_loop_policy()).__name__}
 
         # Check core modules
         try:
-            from core.fetch_matches import fetch_matches
+            from core.fetch_matches import stream_matches  # noqa: F401
             dependency_checks.append(("✅ Core modules", "Accessible"))
         except ImportError as e:
             dependency_checks.append(
@@ -937,7 +831,7 @@ with st.sidebar:
 
     if st.session_state.last_scrape_time:
         st.markdown(
-            f"**Last run**: {st.session_state.last_scrape_time.strftime('%Y-%m-%d %H:%M:%S')}")
+            f"**Last run**: {st.session_state.last_scrape_time.astimezone().strftime('%Y-%m-%d %H:%M:%S')}")
 
     st.markdown("---")
     st.markdown("## 🚀 Quick Actions")
@@ -947,6 +841,7 @@ with st.sidebar:
 
     if st.button("🗑️ Clear Data"):
         st.session_state.scraped_data = None
+        st.session_state.data_version = None
         st.session_state.last_scrape_time = None
         st.session_state.last_error = None
         st.success("Data cleared!")
@@ -954,12 +849,13 @@ with st.sidebar:
 
     if st.button("🧪 Force Test Mode"):
         st.session_state.scraped_data = generate_sample_data()
-        st.session_state.last_scrape_time = datetime.now()
+        st.session_state.data_version = f"sample-{time.time_ns()}"
+        st.session_state.last_scrape_time = datetime.now(timezone.utc)
         st.success("Sample data generated!")
         st.rerun()
 
 # Auto-refresh logic
 if auto_refresh and st.session_state.last_scrape_time:
-    time_diff = datetime.now() - st.session_state.last_scrape_time
+    time_diff = datetime.now(timezone.utc) - st.session_state.last_scrape_time
     if time_diff.total_seconds() > 1800:  # 30 minutes
         st.rerun()
\ No newline at end of file
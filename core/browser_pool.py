@@ -0,0 +1,207 @@
+# core/browser_pool.py
+
+import asyncio
+from contextlib import asynccontextmanager
+from playwright.async_api import async_playwright
+from core.resource_filter import ResourceFilter
+from core.proxy_manager import ProxyManager, is_proxy_error
+from core.identities import IdentityStore, BlockedError
+from core.utils import get_logger
+from core.kickoff import SITE_TIMEZONE
+from core.metrics import span
+
+log = get_logger()
+
+DEFAULT_MAX_PAGES = 4
+DEFAULT_LAUNCH_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+
+class BrowserPool:
+    """
+    One long-lived Chromium per worker, with reusable contexts keyed by
+    (user_agent, proxy, identity) and a cap on the number of pages open at
+    once. Every context gets the resource filter from
+    config/resource_filter.json unless resource_filter=False is passed.
+    Pages borrowed without an explicit proxy go through the proxy manager
+    from config/proxies.json (pass proxy_manager=False to connect directly).
+    Pages borrowed with neither a user agent nor a proxy use a sticky
+    session identity from config/identities.json, whose cookies are saved
+    and reused across runs (pass identities=False for clean contexts).
+    """
+
+    def __init__(self, headless=True, max_pages=DEFAULT_MAX_PAGES, launch_args=None,
+                 resource_filter=None, proxy_manager=None, identities=None):
+        self.headless = headless
+        self.max_pages = max_pages
+        self.launch_args = launch_args or DEFAULT_LAUNCH_ARGS
+        if resource_filter is None:
+            resource_filter = ResourceFilter.from_config()
+        self.resource_filter = resource_filter or None
+        if proxy_manager is None:
+            proxy_manager = ProxyManager.from_config()
+        self.proxy_manager = proxy_manager or None
+        if identities is None:
+            identities = IdentityStore.from_config()
+        self.identities = identities or None
+        self._pw = None
+        self._browser = None
+        self._contexts = {}
+        self._unhealthy = set()
+        self._slots = asyncio.Semaphore(max_pages)
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        try:
+            await self.start()
+        except BaseException:
+            # __aexit__ never runs when entering fails; stop the driver here
+            await self.close()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        if self._pw is None:
+            self._pw = await async_playwright().start()
+        if self.proxy_manager is not None and not self.proxy_manager.validated:
+            with span("proxy_validation"):
+                await self.proxy_manager.validate()
+        await self._ensure_browser()
+
+    async def close(self):
+        for key in list(self._contexts):
+            await self._drop_context(key)
+        if self.identities is not None:
+            self.identities.save()
+        if self.resource_filter is not None:
+            self.resource_filter.report()
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                log.warning(f"[POOL] Error closing browser: {e}")
+            self._browser = None
+        if self._pw is not None:
+            await self._pw.stop()
+            self._pw = None
+
+    async def _ensure_browser(self):
+        if self._browser is not None and self._browser.is_connected():
+            return self._browser
+
+        if self._browser is not None:
+            log.warning("[POOL] Browser disconnected, relaunching")
+            self._contexts.clear()
+            self._unhealthy.clear()
+
+        with span("browser_launch"):
+            self._browser = await self._pw.chromium.launch(
+                headless=self.headless, args=self.launch_args)
+        log.info("[POOL] Chromium launched")
+        return self._browser
+
+    def _context_options(self, user_agent, proxy, identity=None):
+        # Pin the page clock so listing times parse in a known zone (core.kickoff)
+        options = {"user_agent": user_agent, "timezone_id": SITE_TIMEZONE}
+        if proxy:
+            options["proxy"] = {"server": proxy}
+        if identity is not None:
+            storage_state = self.identities.storage_state(identity)
+            if storage_state:
+                options["storage_state"] = storage_state
+        return options
+
+    async def _get_context(self, user_agent=None, proxy=None, identity=None):
+        key = (user_agent, proxy, identity.id if identity is not None else None)
+        async with self._lock:
+            browser = await self._ensure_browser()
+
+            if key in self._unhealthy:
+                log.warning("[POOL] Recycling crashed context")
+                await self._drop_context(key)
+
+            context = self._contexts.get(key)
+            if context is None:
+                context = await browser.new_context(
+                    **self._context_options(user_agent, proxy, identity))
+                if self.resource_filter is not None:
+                    await self.resource_filter.attach(context)
+                context.on("close", lambda _ctx, key=key: self._forget(key))
+                self._contexts[key] = context
+            return key, context
+
+    def _forget(self, key):
+        self._contexts.pop(key, None)
+        self._unhealthy.discard(key)
+
+    async def _drop_context(self, key):
+        context = self._contexts.pop(key, None)
+        self._unhealthy.discard(key)
+        if context is not None:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    @asynccontextmanager
+    async def page(self, user_agent=None, proxy=None):
+        """
+        Borrow a page from the context matching user_agent/proxy. The page is
+        closed on release; the context stays open for the next caller. With
+        neither given, a session identity supplies both and gets its cookies
+        saved on a clean release. With no proxy given, one is picked from the
+        proxy manager and its health is updated from how the page fared.
+        """
+        managed = identity = None
+        if user_agent is None and proxy is None and self.identities is not None:
+            identity = self.identities.acquire(self.proxy_manager)
+            user_agent, proxy = identity.user_agent, identity.proxy
+            if self.proxy_manager is not None:
+                managed = proxy
+        elif proxy is None and self.proxy_manager is not None:
+            proxy = managed = self.proxy_manager.choose()
+
+        async with self._slots:
+            key, context = await self._get_context(user_agent, proxy, identity)
+            page = await context.new_page()
+            page.on("crash", lambda _page, key=key: self._unhealthy.add(key))
+            try:
+                yield page
+            except BaseException as e:
+                if page.is_closed() or not self._browser.is_connected():
+                    self._unhealthy.add(key)
+                if managed is not None and (is_proxy_error(e) or isinstance(e, BlockedError)):
+                    self.proxy_manager.report_failure(managed)
+                if identity is not None and isinstance(e, BlockedError):
+                    # Its cookies may be what gave it away; start that context over
+                    self.identities.report_blocked(identity)
+                    self._unhealthy.add(key)
+                raise
+            else:
+                if managed is not None:
+                    self.proxy_manager.report_success(managed)
+                if identity is not None:
+                    self.identities.report_success(identity)
+                    await self.identities.persist(identity, context)
+            finally:
+                if not page.is_closed():
+                    try:
+                        await page.close()
+                    except Exception:
+                        self._unhealthy.add(key)
+
+
+@asynccontextmanager
+async def ensure_pool(pool=None, **kwargs):
+    """
+    Yield the given pool, or a temporary one closed on exit when the caller
+    did not provide one.
+    """
+    if pool is not None:
+        yield pool
+        return
+
+    async with BrowserPool(**kwargs) as own_pool:
+        yield own_pool
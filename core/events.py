@@ -0,0 +1,235 @@
+# core/events.py
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from core.utils import get_logger
+from core.history_store import DEFAULT_DB_PATH
+
+log = get_logger()
+
+# Event kinds published by the scrapers and the worker
+JOB_STARTED = "job_started"
+JOB_FINISHED = "job_finished"
+TARGET_STARTED = "target_started"
+TARGET_DONE = "target_done"
+PAGE_LOADED = "page_loaded"
+PAGE_READY = "page_ready"
+ROWS_FOUND = "rows_found"
+SAVED = "saved"
+ERROR = "error"
+LOG = "log"  # any other scraper log line
+
+KEEP_JOBS = 20  # jobs whose events are kept in the store
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER,
+    ts TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    level TEXT,
+    tag TEXT,
+    message TEXT,
+    elapsed_ms INTEGER,
+    data TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_events_job ON scrape_events(job_id, id);
+"""
+
+
+@dataclass
+class Event:
+    kind: str
+    message: str
+    tag: str = ""
+    level: str = "INFO"
+    elapsed_ms: int | None = None  # how long the stage the event closes took
+    data: dict = field(default_factory=dict)
+    job_id: int | None = None
+    ts: str = field(default_factory=lambda: datetime.utcnow().isoformat())
+    id: int | None = None
+
+
+def emit(kind, message, tag="", elapsed_ms=None, level=logging.INFO, **data):
+    """
+    Publish a progress event. It goes through the scraper logger, so it is
+    printed like any log line and reaches every EventHandler attached to it.
+    """
+    log.log(level, f"[{tag}] {message}" if tag else message, extra={"event": {
+        "kind": kind, "message": message, "tag": tag,
+        "elapsed_ms": round(elapsed_ms) if elapsed_ms is not None else None,
+        "data": data,
+    }})
+
+
+def since_ms(started) -> int:
+    """Milliseconds since a time.monotonic() reading."""
+    return round((time.monotonic() - started) * 1000)
+
+
+class EventLog:
+    """
+    Progress events in the SQLite file shared by the worker and the
+    dashboard. The worker appends, any number of readers poll events()
+    with the last id they have seen.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def append(self, event: Event):
+        with self.conn:
+            cur = self.conn.execute("""
+                INSERT INTO scrape_events (job_id, ts, kind, level, tag, message, elapsed_ms, data)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (event.job_id, event.ts, event.kind, event.level, event.tag, event.message,
+                  event.elapsed_ms, json.dumps(event.data, default=str) if event.data else None))
+        event.id = cur.lastrowid
+
+    def events(self, job_id=None, after_id=0, limit=500) -> list[Event]:
+        """Events newer than after_id, oldest first; job_id=None means the latest job."""
+        if job_id is None:
+            job_id = self.latest_job_id()
+        rows = self.conn.execute("""
+            SELECT * FROM scrape_events WHERE job_id IS ? AND id > ? ORDER BY id LIMIT ?
+        """, (job_id, after_id, limit)).fetchall()
+        return [Event(kind=r["kind"], message=r["message"], tag=r["tag"] or "",
+                      level=r["level"], elapsed_ms=r["elapsed_ms"],
+                      data=json.loads(r["data"]) if r["data"] else {},
+                      job_id=r["job_id"], ts=r["ts"], id=r["id"]) for r in rows]
+
+    def latest_job_id(self) -> int | None:
+        row = self.conn.execute(
+            "SELECT job_id FROM scrape_events ORDER BY id DESC LIMIT 1").fetchone()
+        return row["job_id"] if row is not None else None
+
+    def prune(self, keep_jobs=KEEP_JOBS):
+        """Drop the events of all but the newest keep_jobs jobs."""
+        with self.conn:
+            self.conn.execute("""
+                DELETE FROM scrape_events WHERE job_id NOT IN (
+                    SELECT DISTINCT job_id FROM scrape_events
+                    WHERE job_id IS NOT NULL ORDER BY job_id DESC LIMIT ?)
+            """, (keep_jobs,))
+
+
+class EventHandler(logging.Handler):
+    """
+    Turns scraper log records into events for one job: records published
+    with emit() keep their kind, timing and data, plain log lines become
+    LOG events (ERROR events from log.error and above).
+    """
+
+    def __init__(self, event_log, job_id=None, level=logging.INFO):
+        super().__init__(level)
+        self.event_log = event_log
+        self.job_id = job_id
+
+    def emit(self, record):
+        try:
+            self.event_log.append(record_event(record, self.job_id))
+        except Exception:
+            self.handleError(record)
+
+
+def record_event(record, job_id=None) -> Event:
+    fields = getattr(record, "event", None)
+    if fields is None:
+        fields = {"kind": ERROR if record.levelno >= logging.ERROR else LOG,
+                  "message": record.getMessage()}
+    return Event(job_id=job_id, level=record.levelname,
+                 ts=datetime.utcfromtimestamp(record.created).isoformat(), **fields)
+
+
+@contextmanager
+def capture(job_id=None, path=DEFAULT_DB_PATH):
+    """Publish every scraper log record and event to the event log while active."""
+    event_log = EventLog(path)
+    event_log.prune()
+    handler = EventHandler(event_log, job_id)
+    log.addHandler(handler)
+    try:
+        yield event_log
+    finally:
+        log.removeHandler(handler)
+        event_log.close()
+
+
+def stage_timings(events) -> dict[str, dict]:
+    """Count, total and slowest elapsed_ms per event kind, for timed events."""
+    stages = {}
+    for event in events:
+        if event.elapsed_ms is None:
+            continue
+        stage = stages.setdefault(event.kind, {"count": 0, "total_ms": 0, "max_ms": 0})
+        stage["count"] += 1
+        stage["total_ms"] += event.elapsed_ms
+        stage["max_ms"] = max(stage["max_ms"], event.elapsed_ms)
+    return stages
+
+
+def format_event(event, started=None) -> str:
+    """One display line: time (or offset from started), kind, tag and message."""
+    ts = datetime.fromisoformat(event.ts)
+    when = f"+{(ts - started).total_seconds():6.1f}s" if started else ts.strftime("%H:%M:%S")
+    took = f" ({event.elapsed_ms} ms)" if event.elapsed_ms is not None else ""
+    tag = f"[{event.tag}] " if event.tag else ""
+    return f"[{when}] {event.kind:<14} {tag}{event.message}{took}"
+
+
+def follow(event_log, job_id=None, poll_seconds=1.0):
+    """Yield a job's events as they arrive, until it publishes JOB_FINISHED."""
+    job_id = job_id if job_id is not None else event_log.latest_job_id()
+    last_id = 0
+    while True:
+        for event in event_log.events(job_id, after_id=last_id):
+            last_id = event.id
+            yield event
+            if event.kind == JOB_FINISHED:
+                return
+        time.sleep(poll_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the progress events of a scrape job")
+    parser.add_argument("--db", help="SQLite file shared with the worker (default: the history store)")
+    parser.add_argument("--job", type=int, help="job id (default: the latest job)")
+    parser.add_argument("--follow", action="store_true", help="keep printing events until the job finishes")
+    args = parser.parse_args()
+
+    event_log = EventLog(args.db) if args.db else EventLog()
+    try:
+        events = follow(event_log, args.job) if args.follow else event_log.events(args.job)
+        started = None
+        for event in events:
+            started = started or datetime.fromisoformat(event.ts)
+            print(format_event(event, started))
+        if not args.follow:
+            for kind, stage in stage_timings(event_log.events(args.job)).items():
+                print(f"{kind:<14} {stage['count']:>4}x  total {stage['total_ms']:>8} ms  "
+                      f"max {stage['max_ms']:>7} ms")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        event_log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# core/export.py
+
+import argparse
+import csv
+import io
+import json
+import os
+import textwrap
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from core.utils import get_logger
+from core.history_store import HistoryStore
+from core.jsonl import dumps_line
+
+log = get_logger()
+
+EXPORT_DIR = os.path.join("output", "exports")
+FORMATS = ("csv", "json", "jsonl")
+
+
+def archive_path(run_id, compress=True, export_dir=EXPORT_DIR) -> str:
+    suffix = "" if compress else "_store"
+    return os.path.join(export_dir, f"oddsportal_run_{run_id}_matches{suffix}.zip")
+
+
+def csv_row(match, with_sport=False) -> dict:
+    """A match as a row of the dashboard tables and CSV downloads."""
+    return {
+        'DateTime': match.get('datetime', ''),
+        **({'Sport': match.get('sport', '')} if with_sport else {}),
+        'Country': match.get('country', ''),
+        'League': match.get('league', ''),
+        'Team 1': match.get('team1', ''),
+        'Team 2': match.get('team2', ''),
+        'Odds': ', '.join(match.get('odds', [])),
+        'URL': match.get('match_url', ''),
+    }
+
+
+def write_entry(zf, name, fmt, matches, compression, with_sport=False):
+    """Stream matches into one archive entry, a record at a time."""
+    info = zipfile.ZipInfo(name, date_time=datetime.now().timetuple()[:6])
+    info.compress_type = compression
+    with zf.open(info, "w") as raw:
+        if fmt == "jsonl":
+            for match in matches:
+                raw.write(dumps_line(match))
+            return
+        with io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+            if fmt == "csv":
+                writer = None
+                for match in matches:
+                    row = csv_row(match, with_sport)
+                    if writer is None:
+                        writer = csv.DictWriter(f, fieldnames=list(row), lineterminator="\n")
+                        writer.writeheader()
+                    writer.writerow(row)
+            else:
+                # Same text as json.dumps(matches, indent=2)
+                f.write("[")
+                count = 0
+                for match in matches:
+                    f.write(",\n" if count else "\n")
+                    f.write(textwrap.indent(json.dumps(match, indent=2, ensure_ascii=False), "  "))
+                    count += 1
+                f.write("\n]" if count else "]")
+
+
+def build_run_zip(history, run_id, dest, stamp, compress=True) -> str:
+    """
+    ZIP of one run's full card: csv, json and jsonl per sport and for all
+    sports together, the same files the dashboard offers. Matches are
+    streamed from the history store into the archive, so memory stays flat
+    however large the card is.
+    """
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    # Unique temp name: two dashboard sessions may build the same archive
+    tmp_path = f"{dest}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=compression) as zf:
+            for sport in history.run_sports(run_id) + [None]:
+                prefix = (sport or "consolidated").lower()
+                for fmt in FORMATS:
+                    write_entry(zf, f"{prefix}_matches_{stamp}.{fmt}", fmt,
+                                history.iter_run_matches(run_id, sport=sport), compression,
+                                with_sport=sport is None)
+        os.replace(tmp_path, dest)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return dest
+
+
+def export_run(run_id=None, compress=True, history=None, export_dir=EXPORT_DIR) -> str | None:
+    """
+    ZIP of a run's full card (default: the latest finished run). Archives are
+    built once per run id and mode and reused afterwards. Returns the archive
+    path, or None when the run is unfinished or has no matches.
+    """
+    own_history = history is None
+    history = history or HistoryStore()
+    try:
+        run_id = run_id or history.latest_run_id()
+        if run_id is None:
+            return None
+
+        dest = archive_path(run_id, compress, export_dir)
+        if os.path.exists(dest):
+            return dest
+
+        run = history.run(run_id)
+        if run is None or not run["finished_at"] or not history.run_sports(run_id):
+            log.warning(f"[EXPORT] Run {run_id} has no matches to export")
+            return None
+        stamp = datetime.fromisoformat(run["finished_at"]).replace(
+            tzinfo=timezone.utc).astimezone().strftime("%Y%m%d_%H%M")
+        build_run_zip(history, run_id, dest, stamp, compress=compress)
+        log.info(f"[EXPORT] Archived run {run_id} to {dest}")
+        return dest
+    finally:
+        if own_history:
+            history.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ZIP the matches of a scrape run")
+    parser.add_argument("--run-id", type=int, help="default: the latest finished run")
+    parser.add_argument("--store", action="store_true", help="store files without compression")
+    args = parser.parse_args()
+
+    path = export_run(args.run_id, compress=not args.store)
+    print(path or "Nothing to export")
+
+
+if __name__ == "__main__":
+    main()
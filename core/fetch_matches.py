@@ -1,370 +1,152 @@
 import datetime
+import logging
 import os
-import json
-import pandas as pd
 from core.utils import get_logger
-from playwright.async_api import async_playwright
-import asyncio
+from core.browser_pool import BrowserPool, ensure_pool
+from core.scheduler import Job, run_jobs, DEFAULT_JOB_TIMEOUT
+from core.row_extractor import extract_rows, rows_to_matches, selector_args
+from core.readiness import wait_until_ready
+from core.harvester import iter_harvest
+from core.pipeline import (run_pipeline, file_sinks, saved_files, JsonlSink,
+                           SharedSink, SnapshotSink, HistorySink)
+from core.writers import DEFAULT_FORMATS
+from core.targets import Target, load_targets
+from core.league_filter import league_gate
+from core.identities import check_response
+from core.events import (emit, TARGET_STARTED, TARGET_DONE, PAGE_LOADED,
+                         ROWS_FOUND, ERROR)
+from core.metrics import span, current
 
 log = get_logger()
 
 
-async def scrape_wnba(url: str, output_subfolder: str, user_agent=None) -> list[dict]:
-    matches = []
-
-    output_dir = os.path.join("./output", output_subfolder)
-    os.makedirs(output_dir, exist_ok=True)
-
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        context = await browser.new_context(user_agent=user_agent)
-        page = await context.new_page()
-
-        await page.goto(url, timeout=60000)
-        await page.wait_for_timeout(5000)
-
-        await page.wait_for_selector('div[data-testid="game-row"]')
-        match_blocks = page.locator('div[data-testid="game-row"]')
-
-        count = await match_blocks.count()
-        log.info(f"[WNBA] Found {count} match rows")
-
-        now = datetime.datetime.utcnow()
-        formatted_date = now.strftime('%Y%m%d')
-
-        for i in range(count):
-            try:
-                block = match_blocks.nth(i)
-
-                team_links = block.locator("a[title]")
-                if await team_links.count() < 2:
-                    continue
-
-                team1 = await team_links.nth(0).get_attribute("title")
-                team2 = await team_links.nth(1).get_attribute("title")
-
-                odds_tags = block.locator(
-                    'p[data-testid="odd-container-default"]')
-                odds = []
-                for j in range(await odds_tags.count()):
-                    val = await odds_tags.nth(j).inner_text()
-                    odds.append(val.strip())
-
-                match_datetime = now.replace(
-                    hour=0, minute=0, second=0) + datetime.timedelta(minutes=i * 5)
-
-                matches.append({
-                    "datetime": match_datetime.isoformat(),
-                    "league": "WNBA",
-                    "team1": team1,
-                    "team2": team2,
-                    "odds": odds[:3],
-                    "match_url": url
-                })
-
-            except Exception as e:
-                log.warning(f"[WNBA] Failed to parse match {i}: {e}")
-                continue
-
-        await context.close()
-        await browser.close()
-
-        if matches:
-            df = pd.DataFrame(matches)
-            csv_path = os.path.join(
-                output_dir, f"wnba_matches_{formatted_date}.csv")
-            json_path = os.path.join(
-                output_dir, f"wnba_matches_{formatted_date}.json")
-
-            df.to_csv(csv_path, index=False)
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(matches, f, indent=4)
-
-            log.info(f"[WNBA] Saved CSV to {csv_path}")
-            log.info(f"[WNBA] Saved JSON to {json_path}")
+async def iter_target(target: Target, user_agent=None, pool=None, league=None):
+    """
+    Yield a target's matches as they are read from its listing page. league
+    is the label for rows whose group header names no league.
+    """
+    league = league or target.league
+    tag = target.tag
+    url = target.url_for()
+    row_selector = selector_args(overrides=target.selectors)["row"]
+    # Unwanted leagues are dropped inside the DOM pass, before odds are read
+    gate = league_gate(target.name, target.max_tier) if target.league_filter else None
+
+    async with ensure_pool(pool) as browser_pool:
+        async with browser_pool.page(user_agent=user_agent) as page:
+            with span("goto", target.name) as goto:
+                response = await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            emit(PAGE_LOADED, f"Loaded {url}", tag, elapsed_ms=goto.elapsed_ms,
+                 status=response.status if response is not None else None)
+            # A 403/429 counts against the session identity (core.identities)
+            check_response(response, tag)
+            with span("wait_ready", target.name):
+                await wait_until_ready(page, selector=row_selector, tag=tag)
+            now = datetime.datetime.utcnow()
+
+            if target.listing == "harvest":
+                # Daily listings lazy-load rows; hand each scroll step's rows
+                # downstream as soon as they are read (the span includes the
+                # time spent waiting on the sinks between steps)
+                with span("harvest", target.name):
+                    async for rows in iter_harvest(page, tag=tag, selectors=target.selectors, gate=gate):
+                        for match in rows_to_matches(
+                                rows, league=league, page_url=url, now=now, tag=tag, sport=target.name):
+                            yield match
+            else:
+                # One evaluate call for every row instead of several per row
+                with span("extract_rows", target.name) as extract:
+                    rows = await extract_rows(page, selectors=target.selectors, gate=gate)
+                emit(ROWS_FOUND, f"Found {len(rows)} match rows", tag,
+                     elapsed_ms=extract.elapsed_ms, rows=len(rows))
+                for match in rows_to_matches(
+                        rows, league=league, page_url=url, now=now, tag=tag, sport=target.name):
+                    yield match
+
+            if gate is not None:
+                gate.report(tag)
+
+
+async def stream_matches(proxy=None, user_agent=None, max_pages=4,
+                         job_timeout=DEFAULT_JOB_TIMEOUT, snapshots=None,
+                         history=None, targets=None) -> int:
+    """
+    Scrape every target straight into its files, snapshot diff and history
+    store without holding a run's matches in memory. With the "jsonl" output
+    format every target also appends to one consolidated JSONL file.
+    Targets default to the whole registry. Returns the match count.
+
+    With a snapshot store (incremental mode) the files only get the matches
+    that are new or whose odds or kickoff moved since the last run, as
+    <prefix>_changes_<date>_<time> files, so file writes follow churn
+    rather than card size. The full card stays in the history store.
+    """
+    targets = targets if targets is not None else load_targets()
+    kind = "changes" if snapshots is not None else "matches"
+    now = datetime.datetime.now()
+    consolidated = None
+    if "jsonl" in DEFAULT_FORMATS:
+        consolidated = JsonlSink(os.path.join(
+            "./output", f"consolidated_{kind}_{now.strftime('%Y%m%d_%H%M')}.jsonl"), tag="ALL")
+
+    async def run_target(target, pool):
+        outputs = file_sinks(os.path.join("./output", target.output_folder),
+                             target.output_prefix, tag=target.tag, kind=kind,
+                             suffix=now.strftime("_%H%M%S") if snapshots is not None else "")
+        if consolidated is not None:
+            outputs.append(SharedSink(consolidated))
+        if snapshots is not None:
+            # A failed target ends its snapshot diff as incomplete: its state
+            # is kept, so the next run reports the changes it saw again and
+            # never reports the target's whole card as removed
+            sinks = [SnapshotSink(snapshots, target.name, changed_sinks=outputs)]
         else:
-            log.warning(f"[WNBA] No matches scraped.")
-
-    return matches
-
-
-async def scrape_ncaa(url: str, output_subfolder: str, user_agent=None) -> list[dict]:
-    matches = []
-
-    output_dir = os.path.join("./output", output_subfolder)
-    os.makedirs(output_dir, exist_ok=True)
-
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        context = await browser.new_context(user_agent=user_agent)
-        page = await context.new_page()
-
-        await page.goto(url, timeout=60000)
-        await page.wait_for_timeout(5000)
-
-        await page.wait_for_selector('div[data-testid="game-row"]')
-        match_blocks = page.locator('div[data-testid="game-row"]')
-
-        count = await match_blocks.count()
-        log.info(f"[NCAA] Found {count} match rows")
-
-        now = datetime.datetime.utcnow()
-        formatted_date = now.strftime('%Y%m%d')
-
-        for i in range(count):
-            try:
-                block = match_blocks.nth(i)
-
-                team_links = block.locator("a[title]")
-                if await team_links.count() < 2:
-                    continue
-
-                team1 = await team_links.nth(0).get_attribute("title")
-                team2 = await team_links.nth(1).get_attribute("title")
-
-                odds_tags = block.locator(
-                    'p[data-testid="odd-container-default"]')
-                odds = []
-                for j in range(await odds_tags.count()):
-                    val = await odds_tags.nth(j).inner_text()
-                    odds.append(val.strip())
-
-                match_datetime = now.replace(
-                    hour=0, minute=0, second=0) + datetime.timedelta(minutes=i * 5)
-
-                matches.append({
-                    "datetime": match_datetime.isoformat(),
-                    "league": "NCAA",
-                    "team1": team1,
-                    "team2": team2,
-                    "odds": odds[:3],
-                    "match_url": url
-                })
-
-            except Exception as e:
-                log.warning(f"[NCAA] Failed to parse match {i}: {e}")
-                continue
-
-        await context.close()
-        await browser.close()
-
-        if matches:
-            df = pd.DataFrame(matches)
-            csv_path = os.path.join(
-                output_dir, f"ncaa_matches_{formatted_date}.csv")
-            json_path = os.path.join(
-                output_dir, f"ncaa_matches_{formatted_date}.json")
-
-            df.to_csv(csv_path, index=False)
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(matches, f, indent=4)
-
-            log.info(f"[NCAA] Saved CSV to {csv_path}")
-            log.info(f"[NCAA] Saved JSON to {json_path}")
+            sinks = outputs
+        if history is not None:
+            sinks.append(HistorySink(history, target.name))
+        count = await run_pipeline(iter_target(target, user_agent=user_agent, pool=pool), sinks,
+                                   scope=target.name)
+        saved = saved_files(sinks)
+        if history is not None:
+            history.record_files(saved)
+        if current() is not None:
+            current().add_bytes(target.name, sum(os.path.getsize(p) for p in saved))
+        if not count:
+            log.warning(f"[{target.tag}] No matches scraped.")
+        return count
+
+    def report_start(job):
+        emit(TARGET_STARTED, f"Scraping {job.url}", job.name.upper())
+
+    def report_done(job, outcome):
+        metrics = current()
+        if metrics is not None:
+            metrics.observe("target", outcome.elapsed * 1000, job.name, failed=not outcome.ok)
+            if outcome.ok:
+                metrics.add_rows(job.name, outcome.result)
+        if outcome.ok:
+            emit(TARGET_DONE, f"{outcome.result} matches", job.name.upper(),
+                 elapsed_ms=outcome.elapsed * 1000, matches=outcome.result)
         else:
-            log.warning(f"[NCAA] No matches scraped.")
-
-    return matches
-
-
-async def scrape_nfl(url: str, output_subfolder: str, user_agent=None) -> list[dict]:
-    matches = []
-
-    output_dir = os.path.join("./output", output_subfolder)
-    os.makedirs(output_dir, exist_ok=True)
-
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        context = await browser.new_context(user_agent=user_agent)
-        page = await context.new_page()
-
-        await page.goto(url, timeout=60000)
-        await page.wait_for_timeout(5000)
-
-        await page.wait_for_selector('div[data-testid="game-row"]')
-        match_blocks = page.locator('div[data-testid="game-row"]')
-
-        count = await match_blocks.count()
-        log.info(f"[NFL] Found {count} match rows")
-
-        now = datetime.datetime.utcnow()
-        formatted_date = now.strftime('%Y%m%d')
-
-        for i in range(count):
-            try:
-                block = match_blocks.nth(i)
-
-                team_links = block.locator("a[title]")
-                if await team_links.count() < 2:
-                    continue
-
-                team1 = await team_links.nth(0).get_attribute("title")
-                team2 = await team_links.nth(1).get_attribute("title")
-
-                odds_tags = block.locator(
-                    'p[data-testid="odd-container-default"]')
-                odds = []
-                for j in range(await odds_tags.count()):
-                    val = await odds_tags.nth(j).inner_text()
-                    odds.append(val.strip())
-
-                match_datetime = now.replace(
-                    hour=0, minute=0, second=0) + datetime.timedelta(minutes=i * 5)
-
-                matches.append({
-                    "datetime": match_datetime.isoformat(),
-                    "league": "NFL",
-                    "team1": team1,
-                    "team2": team2,
-                    "odds": odds[:3],
-                    "match_url": url
-                })
-
-            except Exception as e:
-                log.warning(f"[NFL] Failed to parse match {i}: {e}")
-                continue
-
-        await context.close()
-        await browser.close()
-
-        if matches:
-            df = pd.DataFrame(matches)
-            csv_path = os.path.join(
-                output_dir, f"nfl_matches_{formatted_date}.csv")
-            json_path = os.path.join(
-                output_dir, f"nfl_matches_{formatted_date}.json")
-
-            df.to_csv(csv_path, index=False)
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(matches, f, indent=4)
-
-            log.info(f"[NFL] Saved CSV to {csv_path}")
-            log.info(f"[NFL] Saved JSON to {json_path}")
-        else:
-            log.warning(f"[NFL] No matches scraped.")
-
-    return matches
-
-
-async def scrape_sport(sport: str, url: str, output_subfolder: str, user_agent=None) -> list[dict]:
-    matches = []
-
-    output_dir = os.path.join("./output", output_subfolder)
-    os.makedirs(output_dir, exist_ok=True)
-
-    async with async_playwright() as pw:
-        browser = await pw.chromium.launch(headless=True)
-        context = await browser.new_context(user_agent=user_agent)
-        page = await context.new_page()
-
-        await page.goto(url, timeout=60000)
-        await page.wait_for_timeout(5000)
-
-        await page.wait_for_selector('div[data-testid="game-row"]')
-        match_blocks = page.locator('div[data-testid="game-row"]')
-
-        count = await match_blocks.count()
-        log.info(f"[{sport.upper()}] Found {count} match rows")
-
-        now = datetime.datetime.utcnow()
-        formatted_date = now.strftime('%Y%m%d')
-
-        for i in range(count):
-            try:
-                block = match_blocks.nth(i)
-
-                team_links = block.locator("a[title]")
-                if await team_links.count() < 2:
-                    continue
-
-                team1 = await team_links.nth(0).get_attribute("title")
-                team2 = await team_links.nth(1).get_attribute("title")
-
-                odds_tags = block.locator(
-                    'p[data-testid="odd-container-default"]')
-                odds = []
-                for j in range(await odds_tags.count()):
-                    val = await odds_tags.nth(j).inner_text()
-                    odds.append(val.strip())
-
-                match_datetime = now.replace(
-                    hour=0, minute=0, second=0) + datetime.timedelta(minutes=i * 5)
-
-                matches.append({
-                    "datetime": match_datetime.isoformat(),
-                    "league": "Unknown",
-                    "team1": team1,
-                    "team2": team2,
-                    "odds": odds[:3],
-                    "match_url": url
-                })
-
-            except Exception as e:
-                log.warning(
-                    f"[{sport.upper()}] Failed to parse match {i}: {e}")
-                continue
-
-        await context.close()
-        await browser.close()
-
-        if matches:
-            df = pd.DataFrame(matches)
-            csv_path = os.path.join(
-                output_dir, f"{sport}_matches_{formatted_date}.csv")
-            json_path = os.path.join(
-                output_dir, f"{sport}_matches_{formatted_date}.json")
-
-            df.to_csv(csv_path, index=False)
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump(matches, f, indent=4)
-
-            log.info(f"[{sport.upper()}] Saved CSV to {csv_path}")
-            log.info(f"[{sport.upper()}] Saved JSON to {json_path}")
-        else:
-            log.warning(f"[{sport.upper()}] No matches scraped.")
-
-    return matches
-
-
-async def fetch_matches(proxy=None, user_agent=None) -> list[dict]:
-    tomorrow = datetime.datetime.utcnow().date() + datetime.timedelta(days=1)
-    date_str = tomorrow.strftime('%Y%m%d')
-
-    football_url = f"https://www.oddsportal.com/matches/football/{date_str}/"
-    basketball_url = f"https://www.oddsportal.com/matches/basketball/{date_str}/"
-    tennis_url = f"https://www.oddsportal.com/matches/tennis/{date_str}/"
-    futsal_url = f"https://www.oddsportal.com/matches/futsal/{date_str}/"
-    baseball_url = f"https://www.oddsportal.com/matches/baseball/{date_str}/"
-    nfl_url = "https://www.oddsportal.com/american-football/usa/nfl/"
-    ncaa_url = "https://www.oddsportal.com/american-football/usa/ncaa/"
-    wnba_url = "https://www.oddsportal.com/basketball/usa/wnba/"
-
-    all_matches = []
-
-    # FOR scrape_sport: provide 3 args: sport, url, output_subfolder
-    for sport, url in [
-        ("football", football_url),
-        ("basketball", basketball_url),
-        ("tennis", tennis_url),
-        ("futsal", futsal_url),
-        ("baseball", baseball_url),
-    ]:
-        try:
-            result = await scrape_sport(sport, url, sport, user_agent=user_agent)
-            all_matches.extend(result)
-        except Exception as e:
-            log.error(f"[{sport.upper()}] Error during scraping: {e}")
-
-    # For unique scrapers (nfl, ncaa, wnba)
-    for name, url, folder, func in [
-        ("nfl", nfl_url, "nfl", scrape_nfl),
-        ("ncaa", ncaa_url, "ncaa", scrape_ncaa),
-        ("wnba", wnba_url, "wnba", scrape_wnba),
-    ]:
-        try:
-            result = await func(url, folder, user_agent=user_agent)
-            all_matches.extend(result)
-        except Exception as e:
-            log.error(f"[{name.upper()}] Error during scraping: {e}")
-
-    return all_matches
+            emit(ERROR, f"Error during scraping: {outcome.error}", job.name.upper(),
+                 elapsed_ms=outcome.elapsed * 1000, level=logging.ERROR)
+
+    try:
+        async with BrowserPool(max_pages=max_pages) as pool:
+            jobs = [
+                Job(name=t.name, url=t.url_for(), timeout=job_timeout,
+                    run=lambda t=t: run_target(t, pool))
+                for t in targets
+            ]
+            results = await run_jobs(jobs, max_concurrency=max_pages,
+                                     on_start=report_start, on_done=report_done)
+    finally:
+        if consolidated is not None:
+            await consolidated.close()
+            saved = saved_files([consolidated])
+            if history is not None:
+                history.record_files(saved)
+            if current() is not None:
+                current().add_bytes(None, sum(os.path.getsize(p) for p in saved))
+
+    return sum(outcome.result for outcome in results if outcome.ok)
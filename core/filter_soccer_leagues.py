@@ -1,27 +1,26 @@
 # core/filter_soccer_leagues.py
 
-import json
+from core.league_filter import LeagueMatcher, get_matcher
 
-# Load allowed soccer leagues (Tier 1 & 2) from config
+# Allowed soccer leagues (Tier 1 & 2) from config, flattened and normalized
 def load_whitelist():
-    try:
-        with open("config/league_whitelist.json", "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"[!] Failed to load whitelist: {e}")
-        return []
+    matcher = get_matcher()
+    qualified = [f"{country}: {league}" for country, league in matcher.qualified.get("football", {})]
+    return sorted(list(matcher.anywhere.get("football", {})) + qualified)
 
-def filter_soccer(matches):
-    whitelist = load_whitelist()
+def filter_soccer(matches, whitelist=None):
+    """Keep non-football matches, and football matches whose league is whitelisted."""
+    # Compiled once and cached until config/league_whitelist.json changes
+    matcher = LeagueMatcher(whitelist) if whitelist is not None else get_matcher()
     filtered = []
 
     for match in matches:
-        if match["sport"] != "Soccer":
+        if match.get("sport") != "football":
             filtered.append(match)
             continue
 
-        # Check if match belongs to an allowed league
-        if any(league.lower() in match["teams"].lower() for league in whitelist):
+        # The row's own league header, not a guess from the team names
+        if matcher.tier_of("football", match.get("league") or "", match.get("country") or "") is not None:
             filtered.append(match)
 
     return filtered
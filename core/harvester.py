@@ -0,0 +1,112 @@
+# core/harvester.py
+
+import time
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from core.row_extractor import EXTRACT_ROWS_JS, LEAGUE_HEADERS_JS, selector_args
+from core.utils import get_logger
+from core.events import emit, since_ms, ROWS_FOUND
+
+log = get_logger()
+
+DEFAULT_MAX_STEPS = 60
+DEFAULT_GROWTH_TIMEOUT_MS = 2500
+
+# One round trip per step: read the rows that appeared since the last
+# step, then scroll the last row into view to trigger the next batch.
+HARVEST_STEP_JS = f"""
+(sel) => {{
+    const extract = {EXTRACT_ROWS_JS};
+    const all = Array.from(document.querySelectorAll(sel.row));
+    const fresh = extract(all, sel);
+    if (all.length) all[all.length - 1].scrollIntoView({{ block: 'end' }});
+    window.scrollBy(0, window.innerHeight);
+    return {{ rows: fresh, total: all.length }};
+}}
+"""
+
+HEADERS_STEP_JS = f"""
+(sel) => ({LEAGUE_HEADERS_JS})(Array.from(document.querySelectorAll(sel.row)), sel)
+"""
+
+GREW_JS = """
+({row, total}) => {
+    const all = document.querySelectorAll(row);
+    return all.length > total || Array.from(all).some(r => !r.hasAttribute('data-op-seen'));
+}
+"""
+
+UNSEEN_JS = """
+(row) => Array.from(document.querySelectorAll(row)).some(r => !r.hasAttribute('data-op-seen'))
+"""
+
+
+def _row_key(row):
+    return row.get("match_link") or tuple(row.get("teams") or ()) + (row.get("time", ""),)
+
+
+async def iter_harvest(page, max_steps=DEFAULT_MAX_STEPS,
+                       growth_timeout_ms=DEFAULT_GROWTH_TIMEOUT_MS,
+                       next_selector=None, tag="", selectors=None, gate=None):
+    """
+    Scroll (or click next_selector) until the listing stops growing,
+    yielding each step's new rows as a list, de-duplicated by match URL.
+    Each step extracts only rows that were not returned by an earlier step,
+    and indexes keep counting across steps. With a LeagueGate each step
+    first reads the new rows' league headers and then extracts only the
+    wanted ones.
+    """
+    sel = selector_args(only_new=True, overrides=selectors)
+    seen = set()
+    started = time.monotonic()
+    total = 0
+
+    for step in range(1, max_steps + 1):
+        if gate is not None:
+            gate.decide(await page.evaluate(HEADERS_STEP_JS, sel))
+            sel.update(gate.selector_keys())
+        result = await page.evaluate(HARVEST_STEP_JS, sel)
+        fresh = []
+        for row in result["rows"]:
+            key = _row_key(row)
+            if key in seen:
+                continue
+            seen.add(key)
+            row["index"] = total
+            total += 1
+            fresh.append(row)
+        if fresh:
+            yield fresh
+
+        try:
+            await page.wait_for_function(
+                GREW_JS, arg={"row": sel["row"], "total": result["total"]},
+                timeout=growth_timeout_ms)
+            continue
+        except PlaywrightTimeoutError:
+            pass
+
+        if next_selector:
+            next_link = await page.query_selector(next_selector)
+            if next_link is not None:
+                await next_link.click()
+                try:
+                    await page.wait_for_function(
+                        UNSEEN_JS, arg=sel["row"], timeout=growth_timeout_ms * 4)
+                    continue
+                except PlaywrightTimeoutError:
+                    pass
+        break
+
+    emit(ROWS_FOUND, f"Harvested {total} unique rows in {step} step(s)", tag,
+         elapsed_ms=since_ms(started), rows=total, steps=step)
+
+
+async def harvest_rows(page, max_steps=DEFAULT_MAX_STEPS,
+                       growth_timeout_ms=DEFAULT_GROWTH_TIMEOUT_MS,
+                       next_selector=None, tag="", selectors=None, gate=None) -> list[dict]:
+    """Every row iter_harvest() finds, as one list."""
+    rows = []
+    async for fresh in iter_harvest(page, max_steps, growth_timeout_ms, next_selector,
+                                    tag, selectors, gate):
+        rows.extend(fresh)
+    return rows
@@ -0,0 +1,271 @@
+# core/history_store.py
+
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from core.utils import get_logger
+from core.snapshots import match_key
+from core.writers import odds_columns
+from core.kickoff import window_bounds
+
+log = get_logger()
+
+DEFAULT_DB_PATH = os.path.join("output", "odds_history.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    total_matches INTEGER DEFAULT 0,
+    status TEXT DEFAULT 'running'
+);
+
+CREATE TABLE IF NOT EXISTS matches (
+    match_url TEXT PRIMARY KEY,
+    sport TEXT,
+    country TEXT,
+    league TEXT,
+    team1 TEXT,
+    team2 TEXT,
+    kickoff TEXT,
+    first_seen TEXT,
+    last_seen TEXT
+);
+
+CREATE TABLE IF NOT EXISTS odds_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    match_url TEXT NOT NULL REFERENCES matches(match_url),
+    captured_at TEXT NOT NULL,
+    odds_home REAL,
+    odds_draw REAL,
+    odds_away REAL,
+    odds_raw TEXT
+);
+
+CREATE TABLE IF NOT EXISTS run_files (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    path TEXT NOT NULL,
+    bytes INTEGER,
+    PRIMARY KEY (run_id, path)
+);
+
+CREATE INDEX IF NOT EXISTS idx_matches_sport ON matches(sport);
+CREATE INDEX IF NOT EXISTS idx_matches_league ON matches(league);
+CREATE INDEX IF NOT EXISTS idx_matches_kickoff ON matches(kickoff);
+CREATE INDEX IF NOT EXISTS idx_snapshots_match_time ON odds_snapshots(match_url, captured_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_run ON odds_snapshots(run_id);
+"""
+
+
+class HistoryStore:
+    """SQLite (WAL) history of runs, matches and every odds snapshot taken."""
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.run_id = None
+        self._taken = {}  # scope -> keys recorded this run
+
+    def _migrate(self):
+        """Add columns introduced after a database was created."""
+        columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(matches)")}
+        if "country" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE matches ADD COLUMN country TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    # --- writes -------------------------------------------------------
+
+    def start_run(self) -> int:
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (started_at) VALUES (?)", (datetime.utcnow().isoformat(),))
+        self.run_id = cur.lastrowid
+        self._taken = {}
+        return self.run_id
+
+    def finish_run(self, total_matches, status="ok"):
+        if self.run_id is None:
+            return
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET finished_at = ?, total_matches = ?, status = ? WHERE id = ?",
+                (datetime.utcnow().isoformat(), total_matches, status, self.run_id))
+
+    def record(self, sport, matches):
+        """
+        Bulk-insert a batch of one target's matches and their odds for the
+        current run. Keys stay unique across a target's batches, so rows that
+        share a listing URL never overwrite each other.
+        """
+        if self.run_id is None:
+            self.start_run()
+        now = datetime.utcnow().isoformat()
+
+        match_rows = []
+        odds_rows = []
+        taken = self._taken.setdefault(sport, set())
+        for m in matches:
+            url = match_key(m, taken)
+            taken.add(url)
+            match_rows.append((
+                url, sport, m.get("country"), m.get("league"), m.get("team1"), m.get("team2"),
+                m.get("datetime") or None, now, now))
+            cols = odds_columns(m.get("odds"))
+            odds_rows.append((
+                self.run_id, url, now, cols["odds_home"], cols["odds_draw"],
+                cols["odds_away"], json.dumps(m.get("odds", []), ensure_ascii=False)))
+
+        with self.conn:
+            self.conn.executemany("""
+                INSERT INTO matches
+                    (match_url, sport, country, league, team1, team2, kickoff, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(match_url) DO UPDATE SET
+                    country = excluded.country, league = excluded.league,
+                    kickoff = excluded.kickoff, last_seen = excluded.last_seen
+            """, match_rows)
+            self.conn.executemany("""
+                INSERT INTO odds_snapshots
+                    (run_id, match_url, captured_at, odds_home, odds_draw, odds_away, odds_raw)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, odds_rows)
+
+    def record_files(self, paths):
+        """Remember the output files the current run wrote, for core.export."""
+        if self.run_id is None or not paths:
+            return
+        rows = [(self.run_id, p, os.path.getsize(p)) for p in paths if os.path.exists(p)]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO run_files (run_id, path, bytes) VALUES (?, ?, ?)", rows)
+
+    # --- queries ------------------------------------------------------
+
+    def odds_history(self, match_url) -> list[dict]:
+        """Every odds snapshot for one match, oldest first."""
+        rows = self.conn.execute("""
+            SELECT captured_at, run_id, odds_home, odds_draw, odds_away, odds_raw
+            FROM odds_snapshots WHERE match_url = ? ORDER BY captured_at
+        """, (match_url,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def runs(self, limit=20) -> list[dict]:
+        rows = self.conn.execute(
+            "SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def run(self, run_id) -> dict | None:
+        row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def latest_run_id(self) -> int | None:
+        """Id of the latest finished run."""
+        row = self.conn.execute(
+            "SELECT id FROM runs WHERE finished_at IS NOT NULL ORDER BY id DESC LIMIT 1").fetchone()
+        return row["id"] if row is not None else None
+
+    def run_files(self, run_id) -> list[dict]:
+        rows = self.conn.execute(
+            "SELECT path, bytes FROM run_files WHERE run_id = ? ORDER BY path", (run_id,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def latest_matches(self, sport=None, league=None) -> list[dict]:
+        """Matches from the latest finished run, in the scrapers' dict schema."""
+        latest = self.latest_run_id()
+        if latest is None:
+            return []
+        return list(self.iter_run_matches(latest, sport=sport, league=league))
+
+    def run_sports(self, run_id) -> list[str]:
+        rows = self.conn.execute("""
+            SELECT DISTINCT m.sport FROM odds_snapshots s JOIN matches m ON m.match_url = s.match_url
+            WHERE s.run_id = ? ORDER BY m.sport
+        """, (run_id,)).fetchall()
+        return [r["sport"] for r in rows]
+
+    def iter_run_matches(self, run_id, sport=None, league=None):
+        """Yield one run's matches in the scrapers' dict schema, in scrape order."""
+        query = """
+            SELECT m.match_url, m.sport, m.country, m.league, m.team1, m.team2, m.kickoff, s.odds_raw
+            FROM odds_snapshots s JOIN matches m ON m.match_url = s.match_url
+            WHERE s.run_id = ?
+        """
+        params = [run_id]
+        if sport:
+            query += " AND m.sport = ?"
+            params.append(sport)
+        if league:
+            query += " AND m.league = ?"
+            params.append(league)
+
+        for r in self.conn.execute(query + " ORDER BY s.id", params):
+            yield {
+                "datetime": r["kickoff"] or "",
+                "sport": r["sport"],
+                "country": r["country"] or "",
+                "league": r["league"],
+                "team1": r["team1"],
+                "team2": r["team2"],
+                "odds": json.loads(r["odds_raw"] or "[]"),
+                "match_url": r["match_url"],
+            }
+
+    def kickoffs_between(self, start, end, sport=None) -> list[dict]:
+        """Matches whose kickoff (ISO UTC string) falls in [start, end)."""
+        query = "SELECT * FROM matches WHERE kickoff >= ? AND kickoff < ?"
+        params = [start, end]
+        if sport:
+            query += " AND sport = ?"
+            params.append(sport)
+        rows = self.conn.execute(query + " ORDER BY kickoff", params).fetchall()
+        return [dict(r) for r in rows]
+
+    def starting_soon(self, within=timedelta(hours=2), sport=None) -> list[dict]:
+        """Matches kicking off in the next `within`, e.g. to re-scrape their odds."""
+        start, end = window_bounds(within)
+        return self.kickoffs_between(start, end, sport=sport)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the odds history store")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("runs", help="list recent runs")
+    odds = sub.add_parser("odds", help="odds movement for one match")
+    odds.add_argument("match_url")
+    latest = sub.add_parser("latest", help="matches from the latest run")
+    latest.add_argument("--sport")
+    latest.add_argument("--league")
+    upcoming = sub.add_parser("upcoming", help="matches kicking off soon")
+    upcoming.add_argument("--minutes", type=int, default=120)
+    upcoming.add_argument("--sport")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db)
+    if args.command == "runs":
+        result = store.runs()
+    elif args.command == "odds":
+        result = store.odds_history(args.match_url)
+    elif args.command == "upcoming":
+        result = store.starting_soon(timedelta(minutes=args.minutes), sport=args.sport)
+    else:
+        result = store.latest_matches(sport=args.sport, league=args.league)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
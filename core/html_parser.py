@@ -0,0 +1,171 @@
+# core/html_parser.py
+
+import re
+import sys
+import time
+from urllib.parse import urljoin, urlparse
+from core.row_extractor import (
+    ROW_SELECTOR, TEAM_SELECTOR, ODDS_SELECTOR, TIME_SELECTOR,
+    GROUP_SELECTOR, DATE_HEADER_SELECTOR, LEAGUE_HEADER_SELECTOR,
+)
+
+TIME_RE = re.compile(r"\b\d{1,2}:\d{2}\b")
+
+
+class SoupBackend:
+    """BeautifulSoup tree, built with lxml when installed or html.parser otherwise."""
+
+    def __init__(self, features="html.parser"):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+        self.features = features
+        self.name = "lxml" if features == "lxml" else "bs4"
+
+    def parse(self, html):
+        return self._soup(html, self.features)
+
+    def select(self, node, css):
+        return node.select(css)
+
+    def select_one(self, node, css):
+        return node.select_one(css)
+
+    def attr(self, node, name):
+        return node.get(name)
+
+    def text(self, node, sep=""):
+        return node.get_text(sep).strip() if node is not None else ""
+
+
+class SelectolaxBackend:
+    """Lexbor-based parser, several times faster than BeautifulSoup."""
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, html):
+        return self._parser(html)
+
+    def select(self, node, css):
+        return node.css(css)
+
+    def select_one(self, node, css):
+        return node.css_first(css)
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+    def text(self, node, sep=""):
+        return node.text(separator=sep).strip() if node is not None else ""
+
+
+def get_backend(name="auto"):
+    """Return a parser backend by name; "auto" picks the fastest installed one."""
+    if name in ("auto", "selectolax"):
+        try:
+            return SelectolaxBackend()
+        except ImportError:
+            if name == "selectolax":
+                raise
+    if name in ("auto", "lxml"):
+        try:
+            import lxml  # noqa: F401
+            return SoupBackend("lxml")
+        except ImportError:
+            if name == "lxml":
+                raise
+    return SoupBackend("html.parser")
+
+
+def _depth(href, base_url):
+    return len([p for p in urlparse(urljoin(base_url, href)).path.split("/") if p])
+
+
+def parse_listing_html(html: str, base_url: str, backend="auto", keep=None) -> list[dict]:
+    """
+    Parse a captured listing page into the same raw row records that
+    row_extractor.extract_rows() returns from a live page. keep(country,
+    league) can reject a whole group before its rows are parsed.
+    """
+    be = get_backend(backend) if isinstance(backend, str) else backend
+    doc = be.parse(html)
+    header = {"date_header": "", "country": "", "league": "", "league_url": ""}
+    records = []
+
+    groups = be.select(doc, GROUP_SELECTOR)
+    if groups:
+        blocks = [(group, be.select(group, ROW_SELECTOR)) for group in groups]
+    else:
+        blocks = [(None, be.select(doc, ROW_SELECTOR))]
+
+    for group, rows in blocks:
+        if group is not None:
+            date_el = be.select_one(group, DATE_HEADER_SELECTOR)
+            if date_el is not None:
+                header["date_header"] = be.text(date_el)
+            league_el = be.select_one(group, LEAGUE_HEADER_SELECTOR)
+            if league_el is not None:
+                for a in be.select(league_el, "a[href]"):
+                    href = be.attr(a, "href")
+                    d = _depth(href, base_url)
+                    if d == 2:
+                        header["country"] = be.text(a)
+                    elif d == 3:
+                        header["league"] = be.text(a)
+                        header["league_url"] = urljoin(base_url, href)
+
+        if keep is not None and not keep(header["country"], header["league"]):
+            continue
+
+        for row in rows:
+            teams = [be.attr(a, "title") for a in be.select(row, TEAM_SELECTOR)]
+            odds = [be.text(p) for p in be.select(row, ODDS_SELECTOR)]
+            link = next(
+                (be.attr(a, "href") for a in be.select(row, "a[href]")
+                 if _depth(be.attr(a, "href"), base_url) >= 4),
+                None)
+            time_text = be.text(be.select_one(row, TIME_SELECTOR))
+            if not time_text:
+                m = TIME_RE.search(be.text(row, " "))
+                time_text = m.group(0) if m else ""
+
+            records.append({
+                "index": len(records),
+                "teams": teams,
+                "odds": odds,
+                "time": time_text,
+                "match_link": urljoin(base_url, link) if link else "",
+                **header,
+            })
+
+    return records
+
+
+def benchmark(path, base_url="https://www.oddsportal.com/", backend="auto", repeat=10):
+    """Parse a saved snapshot repeatedly and report rows parsed per second."""
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    be = get_backend(backend)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        rows = parse_listing_html(html, base_url, backend=be)
+    elapsed = time.perf_counter() - started
+
+    rate = len(rows) * repeat / elapsed if elapsed else 0.0
+    print(f"[{be.name}] {len(rows)} rows x {repeat} in {elapsed:.3f}s ({rate:,.0f} rows/s)")
+    return rate
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python -m core.html_parser SNAPSHOT.html [backend] [repeat]")
+        sys.exit(1)
+    benchmark(
+        sys.argv[1],
+        backend=sys.argv[2] if len(sys.argv) > 2 else "auto",
+        repeat=int(sys.argv[3]) if len(sys.argv) > 3 else 10,
+    )
@@ -0,0 +1,216 @@
+# core/identities.py
+
+import argparse
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, asdict, fields
+from core.utils import get_logger
+from utils.user_agent_pool import USER_AGENTS, get_random_user_agent
+
+log = get_logger()
+
+CONFIG_PATH = os.path.join("config", "identities.json")
+DEFAULT_STATE_DIR = os.path.join("output", "state", "identities")
+
+DEFAULT_POOL_SIZE = 3
+DEFAULT_MAX_BLOCKS = 2      # blocked visits in a row before an identity is retired
+DEFAULT_MAX_AGE_HOURS = 72  # older cookies are more trouble than they save
+
+# Responses that mean the site refused this identity rather than failed
+BLOCK_STATUSES = (403, 429)
+
+
+class BlockedError(RuntimeError):
+    """The site answered with a block page for the current identity."""
+
+
+def check_response(response, tag=""):
+    """Raise BlockedError when a page.goto() response is a block."""
+    if response is not None and response.status in BLOCK_STATUSES:
+        raise BlockedError(f"[{tag}] Blocked with HTTP {response.status} on {response.url}")
+
+
+@dataclass
+class Identity:
+    """A sticky browser identity: one UA and proxy plus its saved cookies."""
+    id: str
+    user_agent: str
+    proxy: str | None = None
+    created: float = 0.0
+    last_used: float = 0.0
+    uses: int = 0
+    blocks: int = 0
+
+
+class IdentityStore:
+    """
+    Session identities persisted under output/state/identities: an index of
+    UA/proxy pairs plus one Playwright storage_state file each, so cookies,
+    consent choices and warm-up redirects carry over between runs. acquire()
+    hands out the least recently used identity; report_blocked() retires one
+    after max_blocks blocks in a row and mints a fresh one in its place.
+    """
+
+    def __init__(self, state_dir=DEFAULT_STATE_DIR, pool_size=DEFAULT_POOL_SIZE,
+                 max_blocks=DEFAULT_MAX_BLOCKS, max_age_hours=DEFAULT_MAX_AGE_HOURS):
+        self.state_dir = state_dir
+        self.pool_size = max(1, pool_size)
+        self.max_blocks = max_blocks
+        self.max_age = max_age_hours * 3600
+        self.index_path = os.path.join(state_dir, "identities.json")
+        self.identities = self._load()
+
+    @classmethod
+    def from_config(cls, path=CONFIG_PATH):
+        """The configured store, or None when identities are disabled."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cfg = json.load(f)
+        except FileNotFoundError:
+            cfg = {}
+        except Exception as e:
+            log.warning(f"[IDENTITY] Failed to load {path}: {e}")
+            cfg = {}
+        if not cfg.get("enabled", True):
+            return None
+        return cls(
+            state_dir=cfg.get("state_dir", DEFAULT_STATE_DIR),
+            pool_size=cfg.get("pool_size", DEFAULT_POOL_SIZE),
+            max_blocks=cfg.get("max_blocks", DEFAULT_MAX_BLOCKS),
+            max_age_hours=cfg.get("max_age_hours", DEFAULT_MAX_AGE_HOURS),
+        )
+
+    def _load(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.warning(f"[IDENTITY] Failed to load {self.index_path}, starting fresh: {e}")
+            return {}
+        known = {f.name for f in fields(Identity)}
+        identities = {}
+        for entry in entries:
+            identity = Identity(**{k: v for k, v in entry.items() if k in known})
+            identities[identity.id] = identity
+        return identities
+
+    def save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump([asdict(i) for i in self.identities.values()], f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    # --- storage state ------------------------------------------------
+
+    def storage_path(self, identity) -> str:
+        return os.path.join(self.state_dir, f"{identity.id}.json")
+
+    def storage_state(self, identity) -> str | None:
+        """The saved storage_state file for new_context(), if there is one."""
+        path = self.storage_path(identity)
+        return path if os.path.exists(path) else None
+
+    async def persist(self, identity, context):
+        """Save the context's cookies and local storage for the next run."""
+        try:
+            state = await context.storage_state()
+        except Exception as e:
+            log.debug(f"[IDENTITY] Could not read storage state for {identity.id}: {e}")
+            return
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self.storage_path(identity)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(path + ".tmp", path)
+
+    # --- selection and feedback ---------------------------------------
+
+    def _mint(self, proxy_manager=None):
+        in_use = {i.user_agent for i in self.identities.values()}
+        fresh = [ua for ua in USER_AGENTS if ua not in in_use]
+        now = time.time()
+        identity = Identity(
+            id=uuid.uuid4().hex[:12],
+            user_agent=fresh[0] if fresh else get_random_user_agent(),
+            proxy=proxy_manager.choose() if proxy_manager is not None else None,
+            created=now,
+        )
+        self.identities[identity.id] = identity
+        log.info(f"[IDENTITY] New identity {identity.id} via {identity.proxy or 'direct'}")
+        return identity
+
+    def _retire(self, identity, reason):
+        self.identities.pop(identity.id, None)
+        try:
+            os.remove(self.storage_path(identity))
+        except FileNotFoundError:
+            pass
+        log.info(f"[IDENTITY] Retired {identity.id} ({reason})")
+
+    def acquire(self, proxy_manager=None) -> Identity:
+        """
+        The least recently used identity, topping the pool up to pool_size
+        first. An identity whose proxy has been quarantined or evicted keeps
+        its UA and cookies but moves to a healthy proxy.
+        """
+        now = time.time()
+        for identity in list(self.identities.values()):
+            if now - identity.created > self.max_age:
+                self._retire(identity, "expired")
+        while len(self.identities) < self.pool_size:
+            self._mint(proxy_manager)
+
+        identity = min(self.identities.values(), key=lambda i: i.last_used)
+        if proxy_manager is not None and identity.proxy is not None:
+            health = proxy_manager.health.get(identity.proxy)
+            if health is None or not health.available():
+                identity.proxy = proxy_manager.choose()
+                log.info(f"[IDENTITY] {identity.id} moved to {identity.proxy or 'direct'}")
+        identity.last_used = now
+        identity.uses += 1
+        return identity
+
+    def report_success(self, identity):
+        identity.blocks = 0
+
+    def report_blocked(self, identity):
+        identity.blocks += 1
+        if identity.blocks >= self.max_blocks:
+            self._retire(identity, f"blocked {identity.blocks} times")
+
+    def summary(self) -> list[dict]:
+        return [{
+            "id": i.id,
+            "user_agent": i.user_agent,
+            "proxy": i.proxy,
+            "uses": i.uses,
+            "blocks": i.blocks,
+            "age_hours": round((time.time() - i.created) / 3600, 1),
+            "warm": self.storage_state(i) is not None,
+        } for i in sorted(self.identities.values(), key=lambda i: i.last_used)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List or reset the saved session identities")
+    parser.add_argument("--config", default=CONFIG_PATH)
+    parser.add_argument("--reset", action="store_true", help="Retire every identity")
+    args = parser.parse_args()
+
+    store = IdentityStore.from_config(args.config)
+    if store is None:
+        print(f"Session identities are disabled in {args.config}")
+        return
+    if args.reset:
+        for identity in list(store.identities.values()):
+            store._retire(identity, "reset")
+        store.save()
+    print(json.dumps(store.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# core/job_queue.py
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+from core.utils import get_logger
+from core.history_store import DEFAULT_DB_PATH
+
+log = get_logger()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    reason TEXT NOT NULL,
+    targets TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    queued_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    run_id INTEGER,
+    total_matches INTEGER,
+    error TEXT
+);
+
+CREATE TABLE IF NOT EXISTS worker_status (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    pid INTEGER,
+    state TEXT,
+    heartbeat_at TEXT,
+    next_run_at TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_status ON scrape_jobs(status, id);
+"""
+
+ACTIVE_STATUSES = ("queued", "running")
+# A worker that has not checked in for this long is considered gone
+WORKER_STALE_SECONDS = 60
+
+
+class JobQueue:
+    """
+    Scrape requests shared between the dashboard and the background worker,
+    kept next to the odds history in the same SQLite file. enqueue() never
+    stacks a second job while one is queued or running, so any number of
+    dashboard sessions pressing the button still cause a single scrape.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # isolation_level=None: transactions are opened explicitly below
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def enqueue(self, reason="manual", targets=None) -> int | None:
+        """Queue a scrape; returns its id, or None if one is already pending."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._active() is not None:
+                self.conn.execute("COMMIT")
+                return None
+            cur = self.conn.execute(
+                "INSERT INTO scrape_jobs (reason, targets, queued_at) VALUES (?, ?, ?)",
+                (reason, json.dumps(targets) if targets else None, datetime.utcnow().isoformat()))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        log.info(f"[QUEUE] Job {cur.lastrowid} queued ({reason})")
+        return cur.lastrowid
+
+    def claim(self) -> dict | None:
+        """Atomically move the oldest queued job to running and return it."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT * FROM scrape_jobs WHERE status = 'queued' ORDER BY id LIMIT 1").fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE scrape_jobs SET status = 'running', started_at = ? WHERE id = ?",
+                    (datetime.utcnow().isoformat(), row["id"]))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        job = dict(row)
+        job["targets"] = json.loads(job["targets"]) if job["targets"] else None
+        return job
+
+    def finish(self, job_id, status="ok", run_id=None, total_matches=None, error=None):
+        self.conn.execute("""
+            UPDATE scrape_jobs SET status = ?, finished_at = ?, run_id = ?,
+                total_matches = ?, error = ?
+            WHERE id = ?
+        """, (status, datetime.utcnow().isoformat(), run_id, total_matches, error, job_id))
+
+    def fail_running(self, error="worker restarted"):
+        """Close out jobs a previous worker left running when it died."""
+        cur = self.conn.execute("""
+            UPDATE scrape_jobs SET status = 'failed', finished_at = ?, error = ?
+            WHERE status = 'running'
+        """, (datetime.utcnow().isoformat(), error))
+        if cur.rowcount:
+            log.warning(f"[QUEUE] Marked {cur.rowcount} abandoned job(s) as failed")
+
+    def _active(self):
+        return self.conn.execute(
+            "SELECT * FROM scrape_jobs WHERE status IN (?, ?) ORDER BY id LIMIT 1",
+            ACTIVE_STATUSES).fetchone()
+
+    def active(self) -> dict | None:
+        """The queued or running job, if any."""
+        row = self._active()
+        return dict(row) if row is not None else None
+
+    def jobs(self, limit=20) -> list[dict]:
+        rows = self.conn.execute(
+            "SELECT * FROM scrape_jobs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    # --- worker heartbeat ---------------------------------------------
+
+    def heartbeat(self, state, next_run_at=None):
+        self.conn.execute("""
+            INSERT INTO worker_status (id, pid, state, heartbeat_at, next_run_at)
+            VALUES (1, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET pid = excluded.pid, state = excluded.state,
+                heartbeat_at = excluded.heartbeat_at, next_run_at = excluded.next_run_at
+        """, (os.getpid(), state, datetime.utcnow().isoformat(),
+              next_run_at.isoformat() if next_run_at else None))
+
+    def worker_status(self) -> dict | None:
+        row = self.conn.execute("SELECT * FROM worker_status WHERE id = 1").fetchone()
+        return dict(row) if row is not None else None
+
+    def worker_alive(self, stale_after=WORKER_STALE_SECONDS) -> bool:
+        status = self.worker_status()
+        if not status or status["state"] == "stopped" or not status["heartbeat_at"]:
+            return False
+        age = datetime.utcnow() - datetime.fromisoformat(status["heartbeat_at"])
+        return age.total_seconds() < stale_after
@@ -0,0 +1,52 @@
+# core/jsonl.py
+
+import json
+from core.utils import get_logger
+
+log = get_logger()
+
+# orjson is optional; it encodes several times faster than the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ENCODER = "orjson" if orjson is not None else "json"
+
+
+def dumps_line(record) -> bytes:
+    """One record as a UTF-8 JSON line, newline included."""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def loads_line(line):
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def to_jsonl(records) -> bytes:
+    """Records as a JSONL document, e.g. for a download button."""
+    return b"".join(dumps_line(r) for r in records)
+
+
+def write_jsonl(records, path, append=False):
+    """Write (or append) one line per record and return the path."""
+    with open(path, "ab" if append else "wb") as f:
+        for record in records:
+            f.write(dumps_line(record))
+    return path
+
+
+def iter_jsonl(path):
+    """Yield records one line at a time; blank and truncated lines are skipped."""
+    with open(path, "rb") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield loads_line(line)
+            except ValueError as e:
+                log.warning(f"[JSONL] Skipping bad line {lineno} in {path}: {e}")
@@ -0,0 +1,119 @@
+# core/kickoff.py
+
+import datetime
+import os
+import re
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from core.utils import get_logger
+
+log = get_logger()
+
+# Timezone the listing pages render kickoff times in (the browser's zone)
+SITE_TIMEZONE = os.environ.get("ODDSPORTAL_TIMEZONE", "UTC")
+
+MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+RELATIVE_DAYS = {"yesterday": -1, "today": 0, "tomorrow": 1}
+
+# "Tomorrow, 05 Jul  - Play Offs", "05 Jul 2025", "Sunday, 06 Jul"
+DATE_RE = re.compile(r"(\d{1,2})\s+([A-Za-z]{3})[a-z]*\.?(?:\s+(\d{4}))?")
+TIME_RE = re.compile(r"(\d{1,2}):(\d{2})\s*([AaPp][Mm])?")
+
+
+@lru_cache(maxsize=1024)
+def parse_date_header(header, today) -> datetime.date | None:
+    """
+    Calendar date of a listing date header, relative to today (a date in the
+    site timezone). Without a year the closest of last/this/next year wins.
+    """
+    if not header:
+        return None
+    text = header.split(" - ", 1)[0].strip()
+    m = DATE_RE.search(text)
+    if m:
+        day, month = int(m.group(1)), MONTHS.get(m.group(2)[:3].lower())
+        if month is None:
+            return None
+        if m.group(3):
+            years = [int(m.group(3))]
+        else:
+            years = [today.year - 1, today.year, today.year + 1]
+        candidates = []
+        for year in years:
+            try:
+                candidates.append(datetime.date(year, month, day))
+            except ValueError:
+                continue
+        if not candidates:
+            return None
+        return min(candidates, key=lambda d: abs((d - today).days))
+
+    word = text.split(",", 1)[0].strip().lower()
+    if word in RELATIVE_DAYS:
+        return today + datetime.timedelta(days=RELATIVE_DAYS[word])
+    return None
+
+
+@lru_cache(maxsize=2048)
+def parse_time(text) -> datetime.time | None:
+    """"18:30" or "6:30 PM" as a time; None for "Live", "FT", "45'" and blanks."""
+    m = TIME_RE.search(text or "")
+    if not m:
+        return None
+    hour, minute, ampm = int(m.group(1)), int(m.group(2)), m.group(3)
+    if ampm:
+        hour = hour % 12 + (12 if ampm.lower() == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return datetime.time(hour, minute)
+
+
+@lru_cache(maxsize=4096)
+def kickoff_utc(date_header, time_text, today, tz=SITE_TIMEZONE) -> datetime.datetime | None:
+    """UTC kickoff from a row's date header and time cell, or None if unparseable."""
+    kick_time = parse_time(time_text)
+    if kick_time is None:
+        return None
+    day = parse_date_header(date_header, today) or today
+    local = datetime.datetime.combine(day, kick_time, tzinfo=ZoneInfo(tz))
+    return local.astimezone(datetime.timezone.utc)
+
+
+def site_today(now=None, tz=SITE_TIMEZONE) -> datetime.date:
+    """Today's date in the site timezone; now is a naive UTC or aware datetime."""
+    now = now or datetime.datetime.utcnow()
+    if now.tzinfo is None:
+        now = now.replace(tzinfo=datetime.timezone.utc)
+    return now.astimezone(ZoneInfo(tz)).date()
+
+
+def parse_kickoffs(rows, now=None, tz=SITE_TIMEZONE) -> list:
+    """
+    Kickoffs for a batch of row records. A listing has a handful of distinct
+    (date header, time) pairs, so each pair is parsed once and mapped back.
+    """
+    today = site_today(now, tz)
+    pairs = [(r.get("date_header") or "", r.get("time") or "") for r in rows]
+    parsed = {pair: kickoff_utc(pair[0], pair[1], today, tz) for pair in set(pairs)}
+    return [parsed[pair] for pair in pairs]
+
+
+def window_bounds(within, now=None) -> tuple[str, str]:
+    """ISO [now, now + within) bounds, e.g. for HistoryStore.kickoffs_between()."""
+    now = (now or datetime.datetime.now(datetime.timezone.utc)).replace(microsecond=0)
+    return now.isoformat(), (now + within).isoformat()
+
+
+def starting_within(matches, within, now=None) -> list[dict]:
+    """Matches whose kickoff falls in the next `within` (a timedelta)."""
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    soon = []
+    for m in matches:
+        try:
+            kickoff = datetime.datetime.fromisoformat(m.get("datetime") or "")
+        except ValueError:
+            continue
+        if kickoff.tzinfo is not None and now <= kickoff < now + within:
+            soon.append(m)
+    return soon
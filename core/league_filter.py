@@ -0,0 +1,228 @@
+# core/league_filter.py
+
+import json
+import os
+import re
+import unicodedata
+from collections import deque
+from core.utils import get_logger
+
+log = get_logger()
+
+WHITELIST_PATH = os.path.join("config", "league_whitelist.json")
+
+# A bare list in the whitelist file means "football, one tier"
+LEGACY_SPORT = "football"
+
+
+def normalize_name(name) -> str:
+    """Lowercase, strip accents and punctuation: "Süper Lig!" -> "super lig"."""
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", text.lower()).split())
+
+
+class AhoCorasick:
+    """Multi-pattern substring search; built once, then O(len(text)) per lookup."""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for value, pattern in patterns:
+            self._add(pattern, value)
+        self._build()
+
+    def _add(self, pattern, value):
+        node = 0
+        for ch in pattern:
+            nxt = self.goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][ch] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+            node = nxt
+        self.out[node].append(value)
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self.goto[node].items():
+                queue.append(nxt)
+                f = self.fail[node]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def search(self, text):
+        """Every value whose pattern occurs in text."""
+        node = 0
+        found = []
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            found.extend(self.out[node])
+        return found
+
+
+class LeagueMatcher:
+    """
+    Compiled whitelist. Config shape:
+
+        {"aliases": {"EPL": "Premier League"},
+         "sports": {"football": {"tier1": ["Premier League", "England: Championship"],
+                                 "tier2": [...]}}}
+
+    An entry "Country: League" only matches that country's league. Names
+    are normalized and aliases resolved on both sides, then matched with a
+    hash lookup; contains=True also accepts whitelisted names inside longer
+    league names ("UEFA Champions League - Qualification") via Aho-Corasick.
+    """
+
+    def __init__(self, config, contains=False):
+        if isinstance(config, list):
+            config = {"sports": {LEGACY_SPORT: {"tier1": config}}}
+        self.contains = contains
+        self.aliases = {normalize_name(k): normalize_name(v)
+                        for k, v in config.get("aliases", {}).items()}
+        # sport -> {league: tier} and {(country, league): tier}
+        self.anywhere = {}
+        self.qualified = {}
+        self.automata = {}
+
+        for sport, tiers in config.get("sports", {}).items():
+            anywhere, qualified = {}, {}
+            # Tiers rank in file order: the first list is tier 1
+            for tier, names in enumerate(tiers.values(), 1):
+                for entry in names:
+                    country, _, league = entry.rpartition(":")
+                    league = self._canonical(league)
+                    if country.strip():
+                        qualified.setdefault((normalize_name(country), league), tier)
+                    else:
+                        anywhere.setdefault(league, tier)
+            self.anywhere[sport] = anywhere
+            self.qualified[sport] = qualified
+            if contains:
+                self.automata[sport] = AhoCorasick(
+                    (league, f" {league} ") for league in anywhere)
+
+    def _canonical(self, name):
+        norm = normalize_name(name)
+        return self.aliases.get(norm, norm)
+
+    @property
+    def sports(self):
+        return set(self.anywhere)
+
+    def tier_of(self, sport, league, country="") -> int | None:
+        """Best (lowest) tier the league is whitelisted at for sport, or None."""
+        if sport not in self.anywhere:
+            return None
+        league = self._canonical(league)
+        tiers = []
+        if league in self.anywhere[sport]:
+            tiers.append(self.anywhere[sport][league])
+        key = (normalize_name(country), league)
+        if key in self.qualified[sport]:
+            tiers.append(self.qualified[sport][key])
+        if not tiers and self.contains and league:
+            tiers = [self.anywhere[sport][hit]
+                     for hit in self.automata[sport].search(f" {league} ")]
+        return min(tiers) if tiers else None
+
+    def allows(self, match, max_tier=None) -> bool:
+        """Sports without a whitelist always pass; others need a whitelisted league."""
+        sport = match.get("sport")
+        if sport not in self.anywhere:
+            return True
+        tier = self.tier_of(sport, match.get("league") or "", match.get("country") or "")
+        return tier is not None and (max_tier is None or tier <= max_tier)
+
+    def filter(self, matches, max_tier=None) -> list[dict]:
+        return [m for m in matches if self.allows(m, max_tier)]
+
+
+class LeagueGate:
+    """
+    Early filter for one target: decides once per (country, league) group
+    header whether its rows are worth extracting at all. Rows with no
+    league header are kept, since there is nothing to judge them by.
+    """
+
+    def __init__(self, sport, matcher, max_tier=None):
+        self.sport = sport
+        self.matcher = matcher
+        self.max_tier = max_tier
+        self._decisions = {}
+
+    def allows_header(self, country, league) -> bool:
+        key = (country or "", league or "")
+        if key not in self._decisions:
+            if not key[1]:
+                self._decisions[key] = True
+            else:
+                tier = self.matcher.tier_of(self.sport, key[1], key[0])
+                self._decisions[key] = tier is not None and (
+                    self.max_tier is None or tier <= self.max_tier)
+        return self._decisions[key]
+
+    def decide(self, headers):
+        """Decide every [country, league] pair found on the page."""
+        for country, league in headers:
+            self.allows_header(country, league)
+
+    def selector_keys(self) -> dict:
+        """The decisions as "country|league" keys for the in-page extractor."""
+        keys = {"leagueKeys": [], "skipKeys": []}
+        for (country, league), allowed in self._decisions.items():
+            keys["leagueKeys" if allowed else "skipKeys"].append(f"{country}|{league}")
+        return keys
+
+    def report(self, tag=""):
+        kept = sum(self._decisions.values())
+        log.info(f"[{tag}] League filter kept {kept} of {len(self._decisions)} leagues")
+
+
+def league_gate(sport, max_tier=None, path=WHITELIST_PATH) -> LeagueGate | None:
+    """A gate for sport, or None when the whitelist has no entry for it."""
+    matcher = get_matcher(path)
+    if sport not in matcher.sports:
+        return None
+    return LeagueGate(sport, matcher, max_tier)
+
+
+_cache = {}
+
+
+def get_matcher(path=WHITELIST_PATH, contains=False) -> LeagueMatcher:
+    """The compiled whitelist, rebuilt only when the file's mtime changes."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    cached = _cache.get((path, contains))
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    config = {}
+    if mtime is None:
+        log.warning(f"[LEAGUES] {path} not found, no league whitelist applied")
+    else:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+        except Exception as e:
+            log.warning(f"[LEAGUES] Failed to load {path}: {e}")
+            if cached:
+                return cached[1]
+
+    matcher = LeagueMatcher(config, contains=contains)
+    _cache[(path, contains)] = (mtime, matcher)
+    return matcher
@@ -1,55 +1,78 @@
 import asyncio
 import os
-import json
-import pandas as pd
-from datetime import datetime
 from core.utils import get_logger
-from core.fetch_matches import fetch_matches
-from utils.user_agent_pool import get_random_user_agent
+from core.fetch_matches import stream_matches
+from core.snapshots import SnapshotStore, write_deltas
+from core.history_store import HistoryStore
+from core.targets import load_targets
+from core.metrics import RunMetrics, collecting, span
 
 logger = get_logger()
 
-def save_results(matches):
-    if not matches:
-        logger.warning("No matches to save.")
-        return
-
-    flat = []
-    for match in matches:
-        try:
-            team1, team2 = match.get("teams", " vs ").split(" vs ", 1)
-        except ValueError:
-            team1, team2 = match.get("teams", ""), ""
-
-        flat.append({
-            "datetime": match.get("datetime", ""),
-            "league": match.get("league", ""),
-            "team1": team1,
-            "team2": team2,
-            "odds": json.dumps(match.get("odds", []), ensure_ascii=False),
-            "match_url": match.get("match_url", "")
-        })
-
-    df = pd.DataFrame(flat)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    output_path = os.path.join("output", f"consolidated_matches_{timestamp}.csv")
-    df.to_csv(output_path, index=False)
-    logger.info(f"[✔] Results saved to: {output_path}")
 
+def run_scrape(targets=None) -> dict:
+    """
+    One full scrape into the output files, snapshot diff and history store.
+    targets is a list of target names (default: the whole registry). Used by
+    the CLI and by the background worker (core.worker).
+    """
+    proxy = None  # Pages pick proxies from config/proxies.json via the browser pool
+    # No fixed UA: each page borrows a sticky session identity (UA, proxy
+    # and saved cookies) from config/identities.json via the browser pool
+    user_agent = None
 
-def main():
-    logger.info("[*] Starting OddsPortal Scraper...")
-    proxy = None  # Disable for testing
-    user_agent = get_random_user_agent()
-    logger.info(f"[*] Using UA: {user_agent}")
+    outcome = {"run_id": None, "total": 0, "status": "ok", "error": None, "metrics": None}
+    # Stage timings of the whole run, reported to output/metrics/
+    metrics = RunMetrics()
+    history = None
 
     try:
-        matches = asyncio.run(fetch_matches(proxy=proxy, user_agent=user_agent))
-        logger.info(f"[+] Total matches scraped: {len(matches)}")
-        save_results(matches)
+        # Opened inside the try so a locked or corrupt store fails the run
+        # like any other error instead of escaping to the worker
+        snapshots = SnapshotStore()
+        history = HistoryStore()
+        outcome["run_id"] = metrics.run_id = history.start_run()
+        with collecting(metrics):
+            # Matches stream straight to the per-sport files, snapshot diff and
+            # history store, so only the count comes back
+            with span("scrape"):
+                total = asyncio.run(stream_matches(
+                    proxy=proxy, user_agent=user_agent, snapshots=snapshots, history=history,
+                    targets=load_targets(names=targets) if targets else None))
+            logger.info(f"[+] Total matches scraped: {total}")
+            if total:
+                with span("write_deltas"):
+                    delta_path = write_deltas(snapshots.run_deltas, "output")
+                if delta_path:
+                    history.record_files([delta_path])
+                    metrics.add_bytes(None, os.path.getsize(delta_path))
+                with span("snapshot_save"):
+                    snapshots.save()
+            else:
+                logger.warning("No matches to save.")
+        history.finish_run(total)
+        outcome["total"] = total
     except Exception as e:
         logger.error(f"[!] Critical failure: {str(e)}")
+        outcome.update(status="failed", error=str(e))
+        if history is not None:
+            try:
+                history.finish_run(0, status="failed")
+            except Exception as close_error:
+                logger.warning(f"[!] Could not mark run {history.run_id} as failed: {close_error}")
+    finally:
+        if history is not None:
+            history.close()
+        try:
+            outcome["metrics"] = metrics.write()
+        except OSError as e:
+            logger.warning(f"[METRICS] Could not write the run report: {e}")
+    return outcome
+
 
+def main():
+    logger.info("[*] Starting OddsPortal Scraper...")
+    run_scrape()
     logger.info("[✔] Scraping finished.")
 
 
@@ -0,0 +1,250 @@
+# core/metrics.py
+
+import argparse
+import functools
+import inspect
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from core.utils import get_logger
+
+log = get_logger()
+
+METRICS_DIR = os.path.join("output", "metrics")
+PROM_FILE = "oddsportal.prom"  # for node_exporter's textfile collector
+PROM_PREFIX = "oddsportal"
+QUANTILES = (0.5, 0.95)
+
+# The run spans are recorded into; None outside collecting()
+_current = None
+
+
+def percentile(values, q) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _stage_summary(samples) -> dict:
+    durations = [ms for ms, _ in samples]
+    return {
+        "count": len(durations),
+        "errors": sum(1 for _, failed in samples if failed),
+        "total_ms": round(sum(durations)),
+        "p50_ms": round(percentile(durations, 0.5)),
+        "p95_ms": round(percentile(durations, 0.95)),
+        "max_ms": round(max(durations)),
+    }
+
+
+class RunMetrics:
+    """
+    Stage timings, row counts and bytes written for one scrape run, kept
+    per sport as well as for the whole run. Spans without a sport only
+    count towards the run.
+    """
+
+    def __init__(self, run_id=None):
+        self.run_id = run_id
+        self.started_at = datetime.utcnow()
+        self._started = time.monotonic()
+        self.duration_s = None
+        self.spans = defaultdict(list)  # (stage, sport) -> [(ms, failed)]
+        self.rows = defaultdict(int)
+        self.bytes_written = defaultdict(int)
+
+    def observe(self, stage, elapsed_ms, sport=None, failed=False):
+        self.spans[(stage, sport)].append((elapsed_ms, failed))
+
+    def add_rows(self, sport, count):
+        self.rows[sport] += count
+
+    def add_bytes(self, sport, count):
+        self.bytes_written[sport] += count
+
+    def finish(self):
+        self.duration_s = time.monotonic() - self._started
+
+    def report(self) -> dict:
+        """Machine-readable summary: p50/p95 per stage, rows/s and bytes, per run and sport."""
+        duration = self.duration_s if self.duration_s is not None else time.monotonic() - self._started
+        by_stage = defaultdict(list)
+        by_sport = defaultdict(lambda: defaultdict(list))
+        for (stage, sport), samples in self.spans.items():
+            by_stage[stage].extend(samples)
+            if sport is not None:
+                by_sport[sport][stage].extend(samples)
+
+        sports = {}
+        # Files shared by all sports (sport=None) only count towards the run
+        for sport in sorted((set(by_sport) | set(self.rows) | set(self.bytes_written)) - {None}):
+            stages = by_sport.get(sport, {})
+            # A sport's rate is over its own scrape time, not the whole run's
+            busy_s = sum(ms for ms, _ in stages.get("target", [])) / 1000
+            sports[sport] = {
+                "rows": self.rows.get(sport, 0),
+                "rows_per_second": round(self.rows.get(sport, 0) / busy_s, 2) if busy_s else None,
+                "bytes_written": self.bytes_written.get(sport, 0),
+                "stages": {stage: _stage_summary(s) for stage, s in sorted(stages.items())},
+            }
+
+        total_rows = sum(self.rows.values())
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "duration_s": round(duration, 3),
+            "rows": total_rows,
+            "rows_per_second": round(total_rows / duration, 2) if duration else None,
+            "bytes_written": sum(self.bytes_written.values()),
+            "stages": {stage: _stage_summary(s) for stage, s in sorted(by_stage.items())},
+            "sports": sports,
+        }
+
+    def write(self, output_dir=METRICS_DIR) -> str:
+        """
+        Write run_<id>.json and refresh the Prometheus textfile with this
+        run's figures. Returns the JSON path.
+        """
+        report = self.report()
+        os.makedirs(output_dir, exist_ok=True)
+        name = f"run_{self.run_id}" if self.run_id is not None else \
+            f"run_{self.started_at.strftime('%Y%m%d_%H%M%S')}"
+        json_path = os.path.join(output_dir, f"{name}.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+
+        # Written aside and moved into place so a scrape never sees half a file
+        prom_path = os.path.join(output_dir, PROM_FILE)
+        with open(prom_path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(to_prometheus(report, self.spans))
+        os.replace(prom_path + ".tmp", prom_path)
+        log.info(f"[METRICS] Run report saved to {json_path}")
+        return json_path
+
+
+def _labels(**labels) -> str:
+    pairs = ",".join(f'{k}="{v}"' for k, v in labels.items() if v is not None)
+    return f"{{{pairs}}}" if pairs else ""
+
+
+def to_prometheus(report, spans) -> str:
+    """The run report in Prometheus text exposition format."""
+    p = PROM_PREFIX
+    lines = [
+        f"# HELP {p}_stage_duration_seconds Stage durations in the last run.",
+        f"# TYPE {p}_stage_duration_seconds summary",
+    ]
+    for (stage, sport), samples in sorted(spans.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+        durations = [ms / 1000 for ms, _ in samples]
+        for q in QUANTILES:
+            lines.append(f"{p}_stage_duration_seconds"
+                         f"{_labels(stage=stage, sport=sport, quantile=q)} {percentile(durations, q):.3f}")
+        lines.append(f"{p}_stage_duration_seconds_sum{_labels(stage=stage, sport=sport)} {sum(durations):.3f}")
+        lines.append(f"{p}_stage_duration_seconds_count{_labels(stage=stage, sport=sport)} {len(durations)}")
+
+    gauges = [
+        ("run_duration_seconds", "Wall time of the last run.", {None: report["duration_s"]}),
+        ("run_rows", "Matches scraped in the last run.",
+         {None: report["rows"], **{s: v["rows"] for s, v in report["sports"].items()}}),
+        ("run_rows_per_second", "Matches scraped per second in the last run.",
+         {None: report["rows_per_second"],
+          **{s: v["rows_per_second"] for s, v in report["sports"].items()}}),
+        ("run_bytes_written", "Output bytes written in the last run.",
+         {None: report["bytes_written"], **{s: v["bytes_written"] for s, v in report["sports"].items()}}),
+        ("run_timestamp_seconds", "When the last run started.",
+         {None: datetime.fromisoformat(report["started_at"]).replace(tzinfo=timezone.utc).timestamp()}),
+    ]
+    for name, help_text, values in gauges:
+        lines += [f"# HELP {p}_{name} {help_text}", f"# TYPE {p}_{name} gauge"]
+        for sport, value in values.items():
+            if value is not None:
+                lines.append(f"{p}_{name}{_labels(sport=sport)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def collecting(metrics: RunMetrics):
+    """Record every span of the enclosed run into metrics."""
+    global _current
+    previous, _current = _current, metrics
+    try:
+        yield metrics
+    finally:
+        metrics.finish()
+        _current = previous
+
+
+def current() -> RunMetrics | None:
+    return _current
+
+
+class Span:
+    """
+    Times one stage into the current run's metrics (a no-op outside
+    collecting()). Use as `with span("goto", sport):` or as a decorator on
+    sync and async functions. elapsed_ms is set once the block exits.
+    """
+
+    def __init__(self, stage, sport=None):
+        self.stage = stage
+        self.sport = sport
+        self.elapsed_ms = None
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed_ms = (time.monotonic() - self._started) * 1000
+        if _current is not None:
+            _current.observe(self.stage, self.elapsed_ms, self.sport, failed=exc_type is not None)
+        return False
+
+    def __call__(self, fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def timed_async(*args, **kwargs):
+                with Span(self.stage, self.sport):
+                    return await fn(*args, **kwargs)
+            return timed_async
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            with Span(self.stage, self.sport):
+                return fn(*args, **kwargs)
+        return timed
+
+
+def span(stage, sport=None) -> Span:
+    return Span(stage, sport)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show a scrape run's stage timings")
+    parser.add_argument("report", nargs="?", help="run report JSON (default: the latest)")
+    args = parser.parse_args()
+
+    path = args.report
+    if path is None:
+        reports = [os.path.join(METRICS_DIR, f) for f in os.listdir(METRICS_DIR)
+                   if f.endswith(".json")] if os.path.isdir(METRICS_DIR) else []
+        if not reports:
+            print("No run reports yet")
+            return
+        path = max(reports, key=os.path.getmtime)
+
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    print(f"Run {report['run_id']}: {report['rows']} rows in {report['duration_s']}s "
+          f"({report['rows_per_second']} rows/s, {report['bytes_written']} bytes written)")
+    for stage, s in report["stages"].items():
+        print(f"  {stage:<16} {s['count']:>5}x  p50 {s['p50_ms']:>7} ms  p95 {s['p95_ms']:>7} ms  "
+              f"max {s['max_ms']:>7} ms  errors {s['errors']}")
+
+
+if __name__ == "__main__":
+    main()
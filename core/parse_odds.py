@@ -1,7 +1,63 @@
 # core/parse_odds.py
 
+import asyncio
 from playwright.sync_api import sync_playwright
-import time
+from core.browser_pool import ensure_pool
+from core.readiness import wait_until_ready, wait_until_ready_sync
+from core.resource_filter import ResourceFilter
+from core.utils import get_logger
+from core.metrics import span
+
+log = get_logger()
+
+ODDS_TABLE_SELECTOR = "div#odds-data-table"
+SHOW_MORE_SELECTOR = "button:has-text('Show more')"
+
+# Every market table on the page as {name, rows: [[cell text, ...], ...]}
+MARKET_TABLES_JS = """
+(tables) => tables.map(table => {
+    const header = table.querySelector('h2');
+    return {
+        name: header ? header.innerText.trim() : '',
+        rows: Array.from(table.querySelectorAll('tr'), tr =>
+            Array.from(tr.querySelectorAll('td'), td => td.innerText.trim())),
+    };
+})
+"""
+
+
+def classify_markets(tables):
+    """Turn raw market tables into (result_market, result_odds)."""
+    result_market = None
+    result_odds = {}
+
+    for table in tables:
+        market_name = table["name"].lower()
+        if not market_name:
+            continue
+
+        if "moneyline" in market_name or "1x2" in market_name:
+            result_market = "Moneyline"
+            result_odds["Moneyline"] = odds_from_rows(table["rows"])
+
+        elif "draw no bet" in market_name:
+            result_odds["Draw No Bet"] = odds_from_rows(table["rows"])
+
+        elif "double chance" in market_name:
+            result_odds["Double Chance"] = odds_from_rows(table["rows"])
+
+        elif "spread" in market_name or "handicap" in market_name:
+            result_odds["Spread"] = odds_from_rows(table["rows"])
+
+    return result_market, result_odds
+
+
+def odds_from_rows(rows):
+    odds_data = {}
+    for cells in rows:
+        if len(cells) >= 3:
+            odds_data[cells[0]] = cells[1]
+    return odds_data
 
 
 def extract_markets(match_url, proxy=None, user_agent=None):
@@ -10,47 +66,34 @@ def extract_markets(match_url, proxy=None, user_agent=None):
 
     try:
         with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            context = browser.new_context(
-                user_agent=user_agent,
-                proxy={"server": proxy} if proxy else None,
-                viewport={"width": 1280, "height": 800}
-            )
-            page = context.new_page()
-            page.goto(match_url, timeout=30000)
-            page.wait_for_timeout(3000)
+            with span("browser_launch"):
+                browser = p.chromium.launch(headless=True)
+                context = browser.new_context(
+                    user_agent=user_agent,
+                    proxy={"server": proxy} if proxy else None,
+                    viewport={"width": 1280, "height": 800}
+                )
+                ResourceFilter.from_config().attach_sync(context)
+                page = context.new_page()
+            with span("market_goto"):
+                page.goto(match_url, timeout=30000, wait_until="domcontentloaded")
+            with span("market_wait_ready"):
+                wait_until_ready_sync(page, ODDS_TABLE_SELECTOR, tag="MARKETS")
 
             # Click "Show more markets" if it exists
             try:
-                more_button = page.query_selector(
-                    "button:has-text('Show more')")
+                more_button = page.query_selector(SHOW_MORE_SELECTOR)
                 if more_button:
-                    more_button.click()
-                    page.wait_for_timeout(1000)
+                    with span("market_show_more"):
+                        more_button.click()
+                        wait_until_ready_sync(
+                            page, ODDS_TABLE_SELECTOR, max_wait_ms=5000, tag="MARKETS")
             except:
                 pass
 
-            tables = page.query_selector_all("div#odds-data-table")
-
-            for table in tables:
-                header = table.query_selector("h2")
-                if not header:
-                    continue
-                market_name = header.inner_text().strip().lower()
-
-                if "moneyline" in market_name or "1x2" in market_name:
-                    result_market = "Moneyline"
-                    result_odds["Moneyline"] = extract_odds_from_table(table)
-
-                elif "draw no bet" in market_name:
-                    result_odds["Draw No Bet"] = extract_odds_from_table(table)
-
-                elif "double chance" in market_name:
-                    result_odds["Double Chance"] = extract_odds_from_table(
-                        table)
-
-                elif "spread" in market_name or "handicap" in market_name:
-                    result_odds["Spread"] = extract_odds_from_table(table)
+            with span("market_extract"):
+                tables = page.locator(ODDS_TABLE_SELECTOR).evaluate_all(MARKET_TABLES_JS)
+                result_market, result_odds = classify_markets(tables)
 
             browser.close()
 
@@ -60,19 +103,75 @@ def extract_markets(match_url, proxy=None, user_agent=None):
     return result_market, result_odds
 
 
-def extract_odds_from_table(table):
-    try:
-        odds_data = {}
-        rows = table.query_selector_all("tr")
-        for row in rows:
+async def extract_markets_from_page(page, match_url):
+    """Load one match page on an existing page and read all markets at once."""
+    with span("market_goto"):
+        await page.goto(match_url, timeout=30000, wait_until="domcontentloaded")
+    with span("market_wait_ready"):
+        await wait_until_ready(page, selector=ODDS_TABLE_SELECTOR, tag="MARKETS")
+
+    more_button = await page.query_selector(SHOW_MORE_SELECTOR)
+    if more_button:
+        try:
+            with span("market_show_more"):
+                await more_button.click()
+                await wait_until_ready(
+                    page, selector=ODDS_TABLE_SELECTOR, max_wait_ms=5000, tag="MARKETS")
+        except Exception:
+            pass
+
+    with span("market_extract"):
+        tables = await page.locator(ODDS_TABLE_SELECTOR).evaluate_all(MARKET_TABLES_JS)
+        return classify_markets(tables)
+
+
+async def extract_markets_batch(urls, concurrency=4, proxy=None, user_agent=None, pool=None):
+    """
+    Async generator yielding (match_url, result_market, result_odds) as each
+    match finishes. Runs `concurrency` pages in one browser; each worker keeps
+    its page and navigates it from match to match.
+    """
+    todo = asyncio.Queue()
+    for url in urls:
+        todo.put_nowait(url)
+    done = asyncio.Queue()
+
+    async with ensure_pool(pool, max_pages=concurrency) as browser_pool:
+
+        async def worker():
             try:
-                cells = row.query_selector_all("td")
-                if len(cells) >= 3:
-                    team = cells[0].inner_text().strip()
-                    odd = cells[1].inner_text().strip()
-                    odds_data[team] = odd
-            except:
-                continue
-        return odds_data
-    except Exception as e:
-        return {}
+                while not todo.empty():
+                    async with browser_pool.page(user_agent=user_agent, proxy=proxy) as page:
+                        while not todo.empty():
+                            url = todo.get_nowait()
+                            try:
+                                market, odds = await extract_markets_from_page(page, url)
+                            except Exception as e:
+                                log.warning(f"[MARKETS] Failed to extract odds for {url}: {e}")
+                                await done.put((url, None, {}))
+                                if page.is_closed():
+                                    break  # borrow a fresh page
+                                continue
+                            await done.put((url, market, odds))
+            except Exception as e:
+                log.warning(f"[MARKETS] Worker stopped: {e}")
+            finally:
+                await done.put(None)
+
+        workers = [asyncio.create_task(worker())
+                   for _ in range(min(concurrency, todo.qsize()))]
+        live = len(workers)
+        try:
+            while live:
+                item = await done.get()
+                if item is None:
+                    live -= 1
+                    continue
+                yield item
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        if not todo.empty():
+            log.warning(f"[MARKETS] {todo.qsize()} match(es) left unprocessed")
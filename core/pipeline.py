@@ -0,0 +1,335 @@
+# core/pipeline.py
+
+import asyncio
+import csv
+import json
+import os
+import textwrap
+import time
+from datetime import datetime
+from core.utils import get_logger
+from core.events import emit, since_ms, SAVED
+from core.metrics import span
+from core.jsonl import dumps_line
+from core.writers import DEFAULT_FORMATS, PARQUET_ROOT
+
+log = get_logger()
+
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_MAX_PENDING = 4  # batches buffered between a scraper and its sinks
+
+
+class Sink:
+    """
+    Consumes match dicts batch by batch. close(failed) ends the stream;
+    sinks that leave a file behind set saved_path once it is in place.
+    Writes and close are timed as the sink's stage (core.metrics).
+    """
+
+    saved_path = None
+    stage = None
+
+    async def write(self, batch):
+        raise NotImplementedError
+
+    async def close(self, failed=False):
+        pass
+
+
+class FileSink(Sink):
+    """Writes to path + '.tmp' and moves it into place only on a clean close."""
+
+    binary = False
+
+    def __init__(self, path, tag=""):
+        self.path = path
+        self.tag = tag
+        self._tmp_path = path + ".tmp"
+        self._f = None
+        self.count = 0
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._opened = time.monotonic()
+        if self.binary:
+            self._f = open(self._tmp_path, "wb")
+        else:
+            self._f = open(self._tmp_path, "w", encoding="utf-8", newline="")
+
+    async def close(self, failed=False):
+        if self._f is None:
+            return
+        self._finish()
+        self._f.close()
+        if failed or not self.count:
+            os.remove(self._tmp_path)
+            return
+        os.replace(self._tmp_path, self.path)
+        self.saved_path = self.path
+        emit(SAVED, f"Saved {self.count} rows to {self.path}", self.tag,
+             elapsed_ms=since_ms(self._opened), rows=self.count, path=self.path,
+             bytes=os.path.getsize(self.path))
+
+    def _finish(self):
+        pass
+
+
+class CsvSink(FileSink):
+    stage = "write_csv"
+
+    def __init__(self, path, tag=""):
+        super().__init__(path, tag)
+        self._writer = None
+
+    async def write(self, batch):
+        if self._f is None:
+            self._open()
+            self._writer = csv.DictWriter(self._f, fieldnames=list(batch[0].keys()),
+                                          extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerows(batch)
+        self.count += len(batch)
+
+
+class JsonArraySink(FileSink):
+    """Streams the same indented JSON array json.dump(matches, indent=4) writes."""
+
+    stage = "write_json"
+
+    async def write(self, batch):
+        if self._f is None:
+            self._open()
+            self._f.write("[")
+        for match in batch:
+            self._f.write(",\n" if self.count else "\n")
+            self._f.write(textwrap.indent(json.dumps(match, indent=4), " " * 4))
+            self.count += 1
+
+    def _finish(self):
+        self._f.write("\n]" if self.count else "]")
+
+
+class JsonlSink(FileSink):
+    """One JSON record per line, written as each batch arrives."""
+
+    binary = True
+    stage = "write_jsonl"
+
+    async def write(self, batch):
+        if self._f is None:
+            self._open()
+        self._f.write(b"".join(dumps_line(m) for m in batch))
+        self.count += len(batch)
+
+
+class ParquetSink(Sink):
+    """
+    One row group per batch in a single part file under the sport/date
+    partition. The part is written under a hidden temp name (dataset readers
+    skip dot files) and only moved into place on a clean close.
+    """
+
+    stage = "write_parquet"  # includes building the Arrow table
+
+    def __init__(self, sport, formatted_date, root=PARQUET_ROOT, tag=""):
+        self.sport = sport
+        self.formatted_date = formatted_date
+        self.root = root
+        self.tag = tag
+        self._writer = None
+        self.path = None
+
+    async def write(self, batch):
+        from core.writers import parquet_table
+        import pyarrow.parquet as pq
+
+        table = parquet_table(batch)
+        if self._writer is None:
+            part_dir = os.path.join(self.root, f"sport={self.sport}", f"date={self.formatted_date}")
+            os.makedirs(part_dir, exist_ok=True)
+            name = f"part-{datetime.utcnow().strftime('%H%M%S%f')}.parquet"
+            self.path = os.path.join(part_dir, name)
+            self._tmp_path = os.path.join(part_dir, f".{name}.tmp")
+            self._writer = pq.ParquetWriter(self._tmp_path, table.schema, compression="zstd")
+            self._opened = time.monotonic()
+        self._writer.write_table(table)
+
+    async def close(self, failed=False):
+        if self._writer is None:
+            return
+        self._writer.close()
+        self._writer = None
+        if failed:
+            os.remove(self._tmp_path)
+            return
+        os.replace(self._tmp_path, self.path)
+        self.saved_path = self.path
+        emit(SAVED, f"Saved PARQUET to {self.path}", self.tag,
+             elapsed_ms=since_ms(self._opened), path=self.path,
+             bytes=os.path.getsize(self.path))
+
+
+class SharedSink(Sink):
+    """Lets several pipelines feed one sink; the owner closes the inner sink."""
+
+    stage = "write_consolidated"
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    async def write(self, batch):
+        await self.sink.write(batch)
+
+
+class SnapshotSink(Sink):
+    """
+    Diffs batches against the snapshot state. changed_sinks only receive the
+    matches that are new or whose odds or kickoff moved since the last run;
+    they are closed along with this sink.
+    """
+
+    def __init__(self, snapshots, scope, changed_sinks=None):
+        self.snapshots = snapshots
+        self.scope = scope
+        self.changed_sinks = list(changed_sinks or [])
+        snapshots.begin(scope)
+
+    async def write(self, batch):
+        # Timed here rather than as a stage, so the forwarded writes keep theirs
+        with span("snapshot_diff", self.scope):
+            moved = self.snapshots.observe(self.scope, batch)
+        if moved:
+            for sink in self.changed_sinks:
+                await write_batch(sink, moved, self.scope)
+
+    async def close(self, failed=False):
+        self.snapshots.end(self.scope, complete=not failed)
+        for sink in self.changed_sinks:
+            await close_sink(sink, failed, self.scope)
+
+
+class HistorySink(Sink):
+    stage = "history_write"
+
+    def __init__(self, history, scope):
+        self.history = history
+        self.scope = scope
+
+    async def write(self, batch):
+        self.history.record(self.scope, batch)
+
+
+def file_sinks(output_dir, prefix, formatted_date=None, formats=None, tag=None,
+               kind="matches", suffix="") -> list[Sink]:
+    """
+    Per-target sinks for the selected output formats (see core.writers),
+    writing <prefix>_<kind>_<date><suffix>.<ext>.
+    """
+    formatted_date = formatted_date or datetime.utcnow().strftime('%Y%m%d')
+    formats = formats or DEFAULT_FORMATS
+    tag = tag or prefix.upper()
+    base = os.path.join(output_dir, f"{prefix}_{kind}_{formatted_date}{suffix}")
+    sinks = []
+
+    for fmt in formats:
+        if fmt == "csv":
+            sinks.append(CsvSink(base + ".csv", tag))
+        elif fmt == "json":
+            sinks.append(JsonArraySink(base + ".json", tag))
+        elif fmt == "jsonl":
+            sinks.append(JsonlSink(base + ".jsonl", tag))
+        elif fmt == "parquet":
+            try:
+                import pyarrow  # noqa: F401
+                sinks.append(ParquetSink(prefix, formatted_date, tag=tag))
+            except ImportError as e:
+                log.warning(f"[{tag}] Skipping parquet output, missing dependency: {e}")
+        else:
+            log.warning(f"[{tag}] Unknown output format: {fmt}")
+
+    return sinks
+
+
+def saved_files(sinks) -> list[str]:
+    """Paths of the files the given (closed) sinks left on disk."""
+    paths = []
+    for sink in sinks:
+        if sink.saved_path:
+            paths.append(sink.saved_path)
+        paths.extend(saved_files(getattr(sink, "changed_sinks", [])))
+    return paths
+
+
+async def write_batch(sink, batch, scope=None):
+    if sink.stage is None:
+        await sink.write(batch)
+        return
+    with span(sink.stage, scope):
+        await sink.write(batch)
+
+
+async def close_sink(sink, failed=False, scope=None):
+    if sink.stage is None:
+        await sink.close(failed=failed)
+        return
+    with span(sink.stage, scope):
+        await sink.close(failed=failed)
+
+
+async def run_pipeline(source, sinks, batch_size=DEFAULT_BATCH_SIZE,
+                       max_pending=DEFAULT_MAX_PENDING, scope=None) -> int:
+    """
+    Drain an async iterator of match dicts into sinks in batches. At most
+    max_pending batches wait between producer and sinks, so memory stays
+    flat however many matches the source yields. Sinks are closed with
+    failed=True when the source raises, and the error is re-raised. Each
+    sink's work is timed as its stage, for sport scope (core.metrics).
+    """
+    queue = asyncio.Queue(maxsize=max_pending)
+    total = 0
+
+    async def consume():
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                return
+            for sink in sinks:
+                await write_batch(sink, batch, scope)
+
+    consumer = asyncio.create_task(consume())
+
+    async def put(item):
+        # Never block on a full queue once the consumer has died
+        put_task = asyncio.ensure_future(queue.put(item))
+        await asyncio.wait({put_task, consumer}, return_when=asyncio.FIRST_COMPLETED)
+        if not put_task.done():
+            put_task.cancel()
+            consumer.result()
+
+    failed = False
+    try:
+        batch = []
+        async for match in source:
+            batch.append(match)
+            total += 1
+            if len(batch) >= batch_size:
+                await put(batch)
+                batch = []
+        if batch:
+            await put(batch)
+        await put(None)
+        await consumer
+    except BaseException:
+        failed = True
+        consumer.cancel()
+        if hasattr(source, "aclose"):
+            await source.aclose()
+        raise
+    finally:
+        for sink in sinks:
+            try:
+                await close_sink(sink, failed, scope)
+            except Exception as e:
+                log.warning(f"[PIPELINE] Failed to close {type(sink).__name__}: {e}")
+
+    return total
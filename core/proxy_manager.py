@@ -0,0 +1,210 @@
+# core/proxy_manager.py
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from core.utils import get_logger
+
+log = get_logger()
+
+CONFIG_PATH = "config/proxies.json"
+
+DEFAULT_VALIDATE_URL = "https://www.oddsportal.com/robots.txt"
+DEFAULT_VALIDATE_TIMEOUT = 8.0
+DEFAULT_MAX_CHECKS = 20
+DEFAULT_QUARANTINE_BASE = 60.0  # seconds; doubles with every quarantine
+DEFAULT_QUARANTINE_MAX = 1800.0
+DEFAULT_FAILURES_TO_QUARANTINE = 2
+DEFAULT_MAX_STRIKES = 5  # quarantines before a proxy is evicted for good
+LATENCY_ALPHA = 0.3
+
+
+@dataclass
+class ProxyHealth:
+    url: str
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    strikes: int = 0
+    latency: float | None = None  # EWMA, seconds
+    quarantined_until: float = 0.0
+    evicted: bool = False
+
+    @property
+    def success_rate(self):
+        # Laplace-smoothed so a fresh proxy starts at 0.5
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+    @property
+    def score(self):
+        return self.success_rate / (1.0 + (self.latency if self.latency is not None else 1.0))
+
+    def available(self, now=None):
+        return not self.evicted and (now or time.monotonic()) >= self.quarantined_until
+
+
+def is_proxy_error(exc) -> bool:
+    """Network-level failures worth blaming on the proxy, not scraper bugs."""
+    # Covers asyncio's and Playwright's TimeoutError alike
+    if isinstance(exc, asyncio.TimeoutError) or type(exc).__name__ == "TimeoutError":
+        return True
+    text = str(exc)
+    return "net::ERR" in text or "NS_ERROR" in text
+
+
+class ProxyManager:
+    """
+    Health-tracked proxy pool. validate() probes every proxy concurrently;
+    choose() picks among available proxies weighted by success rate and
+    latency. Repeated failures quarantine a proxy with exponential backoff,
+    and too many quarantines evict it for the rest of the run.
+    """
+
+    def __init__(self, proxies, validate_url=DEFAULT_VALIDATE_URL,
+                 validate_timeout=DEFAULT_VALIDATE_TIMEOUT, max_checks=DEFAULT_MAX_CHECKS,
+                 quarantine_base=DEFAULT_QUARANTINE_BASE, quarantine_max=DEFAULT_QUARANTINE_MAX,
+                 failures_to_quarantine=DEFAULT_FAILURES_TO_QUARANTINE,
+                 max_strikes=DEFAULT_MAX_STRIKES, allow_direct=True):
+        self.health = {url: ProxyHealth(url) for url in dict.fromkeys(proxies)}
+        self.validate_url = validate_url
+        self.validate_timeout = validate_timeout
+        self.max_checks = max_checks
+        self.quarantine_base = quarantine_base
+        self.quarantine_max = quarantine_max
+        self.failures_to_quarantine = failures_to_quarantine
+        self.max_strikes = max_strikes
+        self.allow_direct = allow_direct
+        self.validated = False
+
+    @classmethod
+    def from_config(cls, path=CONFIG_PATH):
+        """The configured manager, or None when proxies are disabled or missing."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cfg = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f"[PROXY] Failed to load {path}: {e}")
+            return None
+        if not cfg.get("enabled", False) or not cfg.get("proxies"):
+            return None
+        return cls(
+            cfg["proxies"],
+            validate_url=cfg.get("validate_url", DEFAULT_VALIDATE_URL),
+            validate_timeout=cfg.get("validate_timeout", DEFAULT_VALIDATE_TIMEOUT),
+            max_checks=cfg.get("max_concurrent_checks", DEFAULT_MAX_CHECKS),
+            quarantine_base=cfg.get("quarantine_base", DEFAULT_QUARANTINE_BASE),
+            quarantine_max=cfg.get("quarantine_max", DEFAULT_QUARANTINE_MAX),
+            failures_to_quarantine=cfg.get("failures_to_quarantine", DEFAULT_FAILURES_TO_QUARANTINE),
+            max_strikes=cfg.get("max_strikes", DEFAULT_MAX_STRIKES),
+            allow_direct=cfg.get("allow_direct", True),
+        )
+
+    # --- validation ---------------------------------------------------
+
+    async def _check(self, url, slots):
+        import httpx
+
+        async with slots:
+            try:
+                try:
+                    client = httpx.AsyncClient(proxy=url, timeout=self.validate_timeout)
+                except TypeError:  # httpx < 0.26
+                    client = httpx.AsyncClient(proxies=url, timeout=self.validate_timeout)
+                async with client:
+                    started = time.monotonic()
+                    response = await client.get(self.validate_url)
+                    response.raise_for_status()
+            except Exception as e:
+                log.debug(f"[PROXY] {url} failed validation: {e}")
+                self.report_failure(url)
+                return False
+            self.report_success(url, time.monotonic() - started)
+            return True
+
+    async def validate(self):
+        """Probe every proxy at once (bounded by max_checks) and log the result."""
+        slots = asyncio.Semaphore(self.max_checks)
+        results = await asyncio.gather(*(self._check(url, slots) for url in self.health))
+        self.validated = True
+        log.info(f"[PROXY] {sum(results)}/{len(results)} proxies passed validation")
+        return sum(results)
+
+    # --- selection and feedback ---------------------------------------
+
+    def available(self) -> list[ProxyHealth]:
+        now = time.monotonic()
+        return [h for h in self.health.values() if h.available(now)]
+
+    def choose(self):
+        """A proxy URL weighted by health, or None to go direct when none is usable."""
+        candidates = self.available()
+        if not candidates:
+            if not self.allow_direct:
+                raise RuntimeError("No healthy proxies available")
+            return None
+        return random.choices(candidates, weights=[h.score for h in candidates])[0].url
+
+    def report_success(self, url, latency=None):
+        h = self.health.get(url)
+        if h is None:
+            return
+        h.successes += 1
+        h.consecutive_failures = 0
+        if latency is not None:
+            h.latency = latency if h.latency is None else (
+                LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * h.latency)
+
+    def report_failure(self, url):
+        h = self.health.get(url)
+        if h is None:
+            return
+        h.failures += 1
+        h.consecutive_failures += 1
+        # A proxy that never answered validation goes straight to quarantine
+        if h.consecutive_failures >= self.failures_to_quarantine or not h.successes:
+            self._quarantine(h)
+
+    def _quarantine(self, h):
+        h.strikes += 1
+        h.consecutive_failures = 0
+        if h.strikes >= self.max_strikes:
+            h.evicted = True
+            log.warning(f"[PROXY] Evicted {h.url} after {h.strikes} quarantines")
+            return
+        backoff = min(self.quarantine_base * 2 ** (h.strikes - 1), self.quarantine_max)
+        h.quarantined_until = time.monotonic() + backoff
+        log.info(f"[PROXY] Quarantined {h.url} for {backoff:.0f}s")
+
+    def summary(self) -> list[dict]:
+        now = time.monotonic()
+        return [{
+            "url": h.url,
+            "available": h.available(now),
+            "evicted": h.evicted,
+            "successes": h.successes,
+            "failures": h.failures,
+            "latency_ms": round(h.latency * 1000) if h.latency is not None else None,
+            "score": round(h.score, 3),
+        } for h in sorted(self.health.values(), key=lambda h: -h.score)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the configured proxies")
+    parser.add_argument("--config", default=CONFIG_PATH)
+    args = parser.parse_args()
+
+    manager = ProxyManager.from_config(args.config)
+    if manager is None:
+        print(f"Proxies are disabled or not configured in {args.config}")
+        return
+    asyncio.run(manager.validate())
+    print(json.dumps(manager.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
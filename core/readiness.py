@@ -0,0 +1,113 @@
+# core/readiness.py
+
+import asyncio
+import time
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from core.row_extractor import ROW_SELECTOR
+from core.utils import get_logger
+from core.events import emit, PAGE_READY
+
+log = get_logger()
+
+DEFAULT_MAX_WAIT_MS = 20000
+DEFAULT_STABLE_MS = 750   # row count must hold still this long
+DEFAULT_POLL_MS = 200
+
+# True once every selector matches and the count of the first one has not
+# changed for stableMs. State lives on window between polls.
+STABLE_JS = """
+({selectors, stableMs}) => {
+    const counts = selectors.map(s => document.querySelectorAll(s).length);
+    if (counts.some(n => n === 0)) return false;
+    const state = window.__opReady || (window.__opReady = { n: -1, t: 0 });
+    const now = performance.now();
+    if (counts[0] !== state.n) { state.n = counts[0]; state.t = now; return false; }
+    return now - state.t >= stableMs;
+}
+"""
+
+PRESENT_JS = """
+(selectors) => selectors.every(s => document.querySelector(s) !== null)
+"""
+
+
+def _record(tag, url, started, reason, rows):
+    """The wait's record, also emitted as a PAGE_READY event."""
+    entry = {
+        "tag": tag,
+        "url": url,
+        "wait_ms": round((time.monotonic() - started) * 1000),
+        "reason": reason,
+        "rows": rows,
+    }
+    emit(PAGE_READY, f"Page ready ({reason}, {rows} rows)", tag,
+         elapsed_ms=entry["wait_ms"], reason=reason, rows=rows)
+    return entry
+
+
+async def wait_until_ready(page, selector=ROW_SELECTOR, required=None,
+                           max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                           stable_ms=DEFAULT_STABLE_MS, tag="") -> dict:
+    """
+    Return as soon as the page is parseable: either the network went idle
+    with every required selector present, or the row count stopped growing.
+    Never waits longer than max_wait_ms; raises if no row ever appeared.
+    """
+    selectors = [selector] + list(required or [])
+    started = time.monotonic()
+
+    async def network_idle():
+        await page.wait_for_load_state("networkidle", timeout=max_wait_ms)
+        await page.wait_for_function(PRESENT_JS, arg=selectors, timeout=max_wait_ms)
+        return "network-idle"
+
+    async def rows_stable():
+        await page.wait_for_function(
+            STABLE_JS, arg={"selectors": selectors, "stableMs": stable_ms},
+            polling=DEFAULT_POLL_MS, timeout=max_wait_ms)
+        return "rows-stable"
+
+    tasks = [asyncio.ensure_future(network_idle()), asyncio.ensure_future(rows_stable())]
+    reason = "max-wait"
+    try:
+        pending = set(tasks)
+        deadline = started + max_wait_ms / 1000
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=max(0, deadline - time.monotonic()),
+                return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            finished = [t for t in done if not t.cancelled() and t.exception() is None]
+            if finished:
+                reason = finished[0].result()
+                break
+    finally:
+        for t in tasks:
+            if not t.done():
+                t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    rows = await page.locator(selector).count()
+    entry = _record(tag, page.url, started, reason, rows)
+    if rows == 0:
+        raise PlaywrightTimeoutError(
+            f"No '{selector}' rows after {max_wait_ms} ms")
+    return entry
+
+
+def wait_until_ready_sync(page, selector, required=None,
+                          max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                          stable_ms=DEFAULT_STABLE_MS, tag="") -> dict:
+    """Blocking counterpart of wait_until_ready for sync_playwright pages."""
+    selectors = [selector] + list(required or [])
+    started = time.monotonic()
+    reason = "rows-stable"
+    try:
+        page.wait_for_function(
+            STABLE_JS, arg={"selectors": selectors, "stableMs": stable_ms},
+            polling=DEFAULT_POLL_MS, timeout=max_wait_ms)
+    except PlaywrightTimeoutError:
+        reason = "max-wait"
+    return _record(tag, page.url, started, reason, page.locator(selector).count())
+
@@ -0,0 +1,103 @@
+# core/resource_filter.py
+
+import json
+from urllib.parse import urlparse
+from core.utils import get_logger
+
+log = get_logger()
+
+CONFIG_PATH = "config/resource_filter.json"
+
+# Blocked requests are never downloaded, so savings are estimated from
+# typical sizes per resource type on the listing pages.
+ESTIMATED_BYTES = {
+    "image": 12_000,
+    "font": 40_000,
+    "media": 250_000,
+    "script": 60_000,
+    "stylesheet": 20_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "other": 5_000,
+}
+
+NEVER_BLOCK_TYPES = {"document"}
+
+
+def _domain_matches(host, domains):
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class ResourceFilter:
+    """
+    Allow/deny rules for requests made by scraper pages. Allow domains win
+    over everything; then resource types and domains on the deny lists are
+    aborted. Counts and estimated bytes saved are kept in stats.
+    """
+
+    def __init__(self, block_types=(), block_domains=(), allow_domains=()):
+        self.block_types = set(block_types) - NEVER_BLOCK_TYPES
+        self.block_domains = list(block_domains)
+        self.allow_domains = list(allow_domains)
+        self.stats = {"allowed": 0, "blocked": 0, "bytes_saved": 0, "by_type": {}}
+
+    @classmethod
+    def from_config(cls, path=CONFIG_PATH):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cfg = json.load(f)
+        except Exception as e:
+            log.warning(f"[FILTER] Failed to load {path}: {e}")
+            cfg = {}
+        return cls(
+            block_types=cfg.get("block_types", []),
+            block_domains=cfg.get("block_domains", []),
+            allow_domains=cfg.get("allow_domains", []),
+        )
+
+    def should_block(self, resource_type, url) -> bool:
+        if resource_type in NEVER_BLOCK_TYPES:
+            return False
+        host = urlparse(url).hostname or ""
+        if _domain_matches(host, self.allow_domains):
+            return False
+        if resource_type in self.block_types:
+            return True
+        return _domain_matches(host, self.block_domains)
+
+    def _count(self, request) -> bool:
+        resource_type = request.resource_type
+        if not self.should_block(resource_type, request.url):
+            self.stats["allowed"] += 1
+            return False
+        self.stats["blocked"] += 1
+        self.stats["bytes_saved"] += ESTIMATED_BYTES.get(
+            resource_type, ESTIMATED_BYTES["other"])
+        self.stats["by_type"][resource_type] = self.stats["by_type"].get(resource_type, 0) + 1
+        return True
+
+    async def handle(self, route):
+        if self._count(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def handle_sync(self, route):
+        if self._count(route.request):
+            route.abort()
+        else:
+            route.continue_()
+
+    async def attach(self, context):
+        await context.route("**/*", self.handle)
+
+    def attach_sync(self, context):
+        context.route("**/*", self.handle_sync)
+
+    def report(self):
+        s = self.stats
+        total = s["allowed"] + s["blocked"]
+        log.info(
+            f"[FILTER] Blocked {s['blocked']}/{total} requests, "
+            f"~{s['bytes_saved'] / 1024:,.0f} KB saved {s['by_type']}")
+        return dict(s)
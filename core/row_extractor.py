@@ -0,0 +1,204 @@
+# core/row_extractor.py
+
+import asyncio
+import functools
+import os
+from core.utils import get_logger
+from core.kickoff import parse_kickoffs
+
+log = get_logger()
+
+# "evaluate" reads rows with one in-page call; "html" grabs the rendered
+# HTML once and parses it offline with core.html_parser.
+EXTRACTION_MODES = ("evaluate", "html")
+DEFAULT_EXTRACTION_MODE = os.environ.get("ODDSPORTAL_EXTRACTION_MODE", "evaluate")
+
+ROW_SELECTOR = 'div[data-testid="game-row"]'
+TEAM_SELECTOR = "a[title]"
+ODDS_SELECTOR = 'p[data-testid="odd-container-default"]'
+TIME_SELECTOR = 'div[data-testid="time-item"]'
+GROUP_SELECTOR = "div.eventRow"
+DATE_HEADER_SELECTOR = 'div[data-testid="date-header"]'
+LEAGUE_HEADER_SELECTOR = 'div[data-testid="secondary-header"]'
+
+# Shared by the in-page scripts below: reads a row's group header into
+# `header`, carrying the latest date/country/league forward.
+HEADER_HELPERS_JS = """
+    const depth = (href) => {
+        try { return new URL(href, location.href).pathname.split('/').filter(Boolean).length; }
+        catch (e) { return 0; }
+    };
+    const text = (el) => (el ? el.textContent.trim() : '');
+    const readHeader = (row, header) => {
+        const group = row.closest(sel.group) || row.parentElement;
+        if (!group) return;
+        const dateEl = group.querySelector(sel.dateHeader);
+        if (dateEl) header.date_header = text(dateEl);
+        const leagueEl = group.querySelector(sel.leagueHeader);
+        if (leagueEl) {
+            for (const a of leagueEl.querySelectorAll('a[href]')) {
+                const d = depth(a.getAttribute('href'));
+                if (d === 2) header.country = text(a);
+                if (d === 3) { header.league = text(a); header.league_url = a.href; }
+            }
+        }
+    };
+    const leagueKey = (header) => header.country + '|' + header.league;
+"""
+
+# Runs inside the page: reads every game row in a single round trip and
+# carries the most recent date/league group header forward onto each row.
+# With sel.onlyNew, rows already returned are skipped and the header state
+# survives between calls (used by core.harvester while scrolling). With
+# sel.leagueKeys, rows under any other "country|league" header are skipped
+# before their teams and odds are read; in onlyNew mode only rows under a
+# sel.skipKeys header are marked seen, so a header that appeared after the
+# filter decided stays pending for the next call.
+EXTRACT_ROWS_JS = """
+(rows, sel) => {""" + HEADER_HELPERS_JS + """
+    if (sel.onlyNew) rows = rows.filter(r => !r.hasAttribute('data-op-seen'));
+    const header = (sel.onlyNew && window.__opHeader)
+        || { date_header: '', country: '', league: '', league_url: '' };
+    if (sel.onlyNew) window.__opHeader = header;
+    const wanted = sel.leagueKeys ? new Set(sel.leagueKeys) : null;
+    const skipped = new Set(sel.skipKeys || []);
+
+    const records = [];
+    rows.forEach((row, index) => {
+        readHeader(row, header);
+        if (wanted && !wanted.has(leagueKey(header))) {
+            if (sel.onlyNew && skipped.has(leagueKey(header))) row.setAttribute('data-op-seen', '1');
+            return;
+        }
+        if (sel.onlyNew) row.setAttribute('data-op-seen', '1');
+
+        const teams = Array.from(row.querySelectorAll(sel.team), a => a.getAttribute('title'));
+        const odds = Array.from(row.querySelectorAll(sel.odds), p => p.innerText.trim());
+        const link = Array.from(row.querySelectorAll('a[href]'))
+            .find(a => depth(a.getAttribute('href')) >= 4);
+        let time = text(row.querySelector(sel.time));
+        if (!time) {
+            const m = row.innerText.match(/\\b\\d{1,2}:\\d{2}\\b/);
+            time = m ? m[0] : '';
+        }
+
+        records.push({
+            index: index,
+            teams: teams,
+            odds: odds,
+            time: time,
+            match_link: link ? link.href : '',
+            date_header: header.date_header,
+            country: header.country,
+            league: header.league,
+            league_url: header.league_url,
+        });
+    });
+    return records;
+}
+"""
+
+# First phase of league filtering: the distinct [country, league] headers
+# the rows sit under, without reading any row content or marking rows seen.
+LEAGUE_HEADERS_JS = """
+(rows, sel) => {""" + HEADER_HELPERS_JS + """
+    if (sel.onlyNew) rows = rows.filter(r => !r.hasAttribute('data-op-seen'));
+    const header = Object.assign(
+        { date_header: '', country: '', league: '', league_url: '' },
+        (sel.onlyNew && window.__opHeader) || {});
+    const found = new Map();
+    for (const row of rows) {
+        readHeader(row, header);
+        if (!found.has(leagueKey(header))) found.set(leagueKey(header), [header.country, header.league]);
+    }
+    return Array.from(found.values());
+}
+"""
+
+
+def selector_args(only_new=False, overrides=None):
+    """Selectors for EXTRACT_ROWS_JS; overrides replace them by key (e.g. "row")."""
+    return {
+        "row": ROW_SELECTOR,
+        "team": TEAM_SELECTOR,
+        "odds": ODDS_SELECTOR,
+        "time": TIME_SELECTOR,
+        "group": GROUP_SELECTOR,
+        "dateHeader": DATE_HEADER_SELECTOR,
+        "leagueHeader": LEAGUE_HEADER_SELECTOR,
+        **(overrides or {}),
+        "onlyNew": only_new,
+    }
+
+
+async def extract_rows(page, mode=None, executor=None, snapshot_path=None,
+                       selectors=None, gate=None) -> list[dict]:
+    """
+    Pull every game row on the page as plain dicts in one round trip.
+    Selector overrides apply to "evaluate" mode only. With a LeagueGate
+    (core.league_filter), only rows under wanted league headers are read.
+    """
+    mode = mode or DEFAULT_EXTRACTION_MODE
+    if mode == "html":
+        return await extract_rows_from_html(page, executor, snapshot_path, gate)
+    if mode != "evaluate":
+        raise ValueError(f"Unknown extraction mode: {mode}")
+    sel = selector_args(overrides=selectors)
+    rows = page.locator(sel["row"])
+    if gate is not None:
+        gate.decide(await rows.evaluate_all(LEAGUE_HEADERS_JS, sel))
+        sel.update(gate.selector_keys())
+    return await rows.evaluate_all(EXTRACT_ROWS_JS, sel)
+
+
+async def extract_rows_from_html(page, executor=None, snapshot_path=None, gate=None) -> list[dict]:
+    """
+    Fetch the rendered HTML once and parse it off the event loop. Pass a
+    ProcessPoolExecutor to parse in another process; snapshot_path keeps a
+    copy of the page for offline replay.
+    """
+    from core.html_parser import parse_listing_html
+
+    html = await page.content()
+    if snapshot_path:
+        os.makedirs(os.path.dirname(snapshot_path) or ".", exist_ok=True)
+        with open(snapshot_path, "w", encoding="utf-8") as f:
+            f.write(html)
+
+    loop = asyncio.get_running_loop()
+    keep = gate.allows_header if gate is not None else None
+    return await loop.run_in_executor(
+        executor, functools.partial(parse_listing_html, html, page.url, keep=keep))
+
+
+def rows_to_matches(rows, league, page_url, now=None, tag="", sport="") -> list[dict]:
+    """
+    Map raw row records onto the scrapers' match dict schema. "datetime" is
+    the UTC kickoff read from the row's time cell and date header, or ""
+    when the row shows no kickoff time (live or finished games). Country and
+    league come from the row's group header; league falls back to the given
+    label when the row has none.
+    """
+    kickoffs = parse_kickoffs(rows, now=now)
+    matches = []
+
+    for row, kickoff in zip(rows, kickoffs):
+        teams = row.get("teams") or []
+        if len(teams) < 2:
+            continue
+        if not teams[0] or not teams[1]:
+            log.warning(f"[{tag}] Failed to parse match {row.get('index')}: missing team name")
+            continue
+
+        matches.append({
+            "datetime": kickoff.isoformat() if kickoff else "",
+            "sport": sport,
+            "country": row.get("country") or "",
+            "league": row.get("league") or league,
+            "team1": teams[0],
+            "team2": teams[1],
+            "odds": list(row.get("odds") or [])[:3],
+            "match_url": row.get("match_link") or page_url
+        })
+
+    return matches
@@ -0,0 +1,91 @@
+# core/scheduler.py
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlparse
+from core.utils import get_logger
+
+log = get_logger()
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_HOST_INTERVAL = 1.0  # seconds between job starts against one host
+DEFAULT_JOB_TIMEOUT = 180.0
+
+
+@dataclass
+class Job:
+    name: str
+    url: str
+    run: Callable[[], Awaitable[Any]]
+    timeout: float = DEFAULT_JOB_TIMEOUT
+
+    @property
+    def host(self):
+        return urlparse(self.url).netloc
+
+
+@dataclass
+class JobResult:
+    name: str
+    result: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class HostRateLimiter:
+    """Spaces out job starts so one host never sees more than one per interval."""
+
+    def __init__(self, min_interval=DEFAULT_HOST_INTERVAL):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host):
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def run_jobs(jobs, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                   host_interval=DEFAULT_HOST_INTERVAL,
+                   on_start=None, on_done=None) -> list[JobResult]:
+    """
+    Run independent jobs concurrently under a global cap, a per-host start
+    rate and a per-job timeout. Failures never cancel sibling jobs; they are
+    returned as JobResult.error. Results come back in the order given.
+    """
+    slots = asyncio.Semaphore(max_concurrency)
+    limiter = HostRateLimiter(host_interval)
+
+    async def _run(job):
+        async with slots:
+            await limiter.wait(job.host)
+            if on_start:
+                on_start(job)
+
+            started = time.monotonic()
+            outcome = JobResult(name=job.name)
+            try:
+                outcome.result = await asyncio.wait_for(job.run(), timeout=job.timeout)
+            except asyncio.TimeoutError:
+                outcome.error = TimeoutError(
+                    f"timed out after {job.timeout:g}s")
+            except Exception as e:
+                outcome.error = e
+            outcome.elapsed = time.monotonic() - started
+
+            if on_done:
+                on_done(job, outcome)
+            return outcome
+
+    return await asyncio.gather(*(_run(job) for job in jobs))
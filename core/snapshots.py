@@ -0,0 +1,144 @@
+# core/snapshots.py
+
+import json
+import os
+from datetime import datetime
+from core.utils import get_logger
+
+log = get_logger()
+
+DEFAULT_STATE_DIR = os.path.join("output", "state", "snapshots")
+
+# Fields that make a match "changed" when they differ from the stored state
+TRACKED_FIELDS = ("odds", "datetime")
+
+
+def match_key(match, taken=None):
+    """Key a match by its URL, disambiguating rows that share a listing URL."""
+    key = match.get("match_url", "")
+    if taken is not None and key in taken:
+        key = f"{key}#{match.get('team1', '')}|{match.get('team2', '')}"
+    return key
+
+
+class SnapshotStore:
+    """
+    Last known state of every match, keyed by match URL and grouped by scope
+    (one scope per scraped target). apply() diffs a scope's fresh results
+    against the stored state, updates it, and queues the delta for this run;
+    begin()/observe()/end() do the same for results that arrive in batches.
+    Each scope is stored in its own file and save() rewrites only the scopes
+    that changed, so a quiet run writes nothing.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_DIR):
+        self.path = path
+        self.state = {}
+        self._dirty = set()
+        self._load()
+        self.run_deltas = {}
+        self._pending = {}
+
+    def _scope_path(self, scope):
+        return os.path.join(self.path, f"{scope}.json")
+
+    def _read(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning(f"[SNAPSHOT] Failed to load {path}, starting fresh: {e}")
+            return None
+
+    def _load(self):
+        if os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                if name.endswith(".json"):
+                    scope = name[:-len(".json")]
+                    self.state[scope] = self._read(self._scope_path(scope)) or {}
+
+    def save(self):
+        """Write the scopes whose state changed since they were loaded."""
+        if not self._dirty:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        for scope in sorted(self._dirty):
+            path = self._scope_path(scope)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self.state.get(scope, {}), f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+        log.info(f"[SNAPSHOT] Saved state of {len(self._dirty)} scope(s)")
+        self._dirty.clear()
+
+    def begin(self, scope):
+        """Start a streamed diff for scope; feed batches with observe()."""
+        self._pending[scope] = ({}, {"new": [], "changed": [], "removed": []})
+
+    def observe(self, scope, matches) -> list[dict]:
+        """Add a batch to scope's diff; returns the batch's new and changed matches."""
+        previous = self.state.get(scope, {})
+        current, delta = self._pending[scope]
+        moved = []
+        for match in matches:
+            key = match_key(match, current)
+            current[key] = match
+            old = previous.get(key)
+            if old is None:
+                delta["new"].append(match)
+                moved.append(match)
+            elif any(old.get(f) != match.get(f) for f in TRACKED_FIELDS):
+                delta["changed"].append({**match, "previous_odds": old.get("odds", [])})
+                moved.append(match)
+        return moved
+
+    def end(self, scope, complete=True) -> dict:
+        """
+        Finish a streamed diff. An incomplete stream (the scraper failed part
+        way) leaves the scope's state untouched and records no delta, since
+        its changed-match files are discarded; the next complete run reports
+        those changes again.
+        """
+        current, delta = self._pending.pop(scope)
+        previous = self.state.get(scope, {})
+        if not complete:
+            log.info(f"[SNAPSHOT] {scope}: incomplete, state left as it was")
+            return delta
+
+        delta["removed"] = [m for key, m in previous.items() if key not in current]
+        self.state[scope] = current
+        if not is_empty(delta):
+            self.run_deltas[scope] = delta
+            self._dirty.add(scope)
+        log.info(
+            f"[SNAPSHOT] {scope}: {len(delta['new'])} new, "
+            f"{len(delta['changed'])} changed, {len(delta['removed'])} removed")
+        return delta
+
+    def apply(self, scope, matches) -> dict:
+        self.begin(scope)
+        self.observe(scope, matches)
+        return self.end(scope)
+
+
+def is_empty(delta) -> bool:
+    return not (delta["new"] or delta["changed"] or delta["removed"])
+
+
+def write_deltas(deltas, output_dir, prefix="consolidated"):
+    """Write one delta file for this run; nothing is written when no odds moved."""
+    if not deltas:
+        log.info("[SNAPSHOT] No changes since last run, nothing written.")
+        return None
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(output_dir, f"{prefix}_delta_{timestamp}.json")
+    os.makedirs(output_dir, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated_at": datetime.utcnow().isoformat(),
+            "scopes": deltas,
+        }, f, ensure_ascii=False, indent=4)
+    log.info(f"[✔] Delta saved to: {path}")
+    return path
@@ -0,0 +1,81 @@
+# core/targets.py
+
+import datetime
+import json
+import os
+from dataclasses import dataclass, field
+from core.utils import get_logger
+
+log = get_logger()
+
+CONFIG_PATH = os.path.join("config", "targets.json")
+
+# "harvest" scrolls a lazy-loading daily listing; "page" reads the rows
+# already on a league page in one pass.
+LISTING_MODES = ("harvest", "page")
+
+
+@dataclass
+class Target:
+    """One scrape target from config/targets.json."""
+    name: str
+    url: str
+    league: str = "Unknown"
+    label: str = ""
+    listing: str = "harvest"
+    date_offset_days: int = 1
+    selectors: dict = field(default_factory=dict)
+    output_folder: str = ""
+    output_prefix: str = ""
+    # Skip rows outside config/league_whitelist.json while extracting
+    league_filter: bool = False
+    max_tier: int | None = None
+
+    def __post_init__(self):
+        if self.listing not in LISTING_MODES:
+            raise ValueError(f"Target {self.name}: unknown listing mode {self.listing!r}")
+        self.label = self.label or self.name
+        self.output_folder = self.output_folder or self.name
+        self.output_prefix = self.output_prefix or self.name
+
+    @property
+    def tag(self):
+        return self.name.upper()
+
+    def url_for(self, today=None):
+        """The target URL with {date} filled in as YYYYMMDD, date_offset_days from today."""
+        today = today or datetime.datetime.utcnow().date()
+        day = today + datetime.timedelta(days=self.date_offset_days)
+        return self.url.format(date=day.strftime('%Y%m%d'))
+
+
+def load_targets(path=CONFIG_PATH, names=None) -> list[Target]:
+    """Targets from the registry, optionally only those in names, in file order."""
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+
+    defaults = cfg.get("defaults", {})
+    targets = []
+    for entry in cfg.get("targets", []):
+        if names and entry["name"] not in names:
+            continue
+        output = entry.get("output", {})
+        targets.append(Target(
+            name=entry["name"],
+            url=entry["url"],
+            league=entry.get("league", "Unknown"),
+            label=entry.get("label", ""),
+            listing=entry.get("listing", defaults.get("listing", "harvest")),
+            date_offset_days=entry.get("date_offset_days", defaults.get("date_offset_days", 1)),
+            selectors={**defaults.get("selectors", {}), **entry.get("selectors", {})},
+            output_folder=output.get("folder", ""),
+            output_prefix=output.get("prefix", ""),
+            league_filter=entry.get("league_filter", defaults.get("league_filter", False)),
+            max_tier=entry.get("max_tier"),
+        ))
+
+    if names:
+        missing = set(names) - {t.name for t in targets}
+        if missing:
+            log.warning(f"[TARGETS] Not in {path}: {', '.join(sorted(missing))}")
+    return targets
@@ -0,0 +1,135 @@
+# core/worker.py
+
+import argparse
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from core.utils import get_logger
+from core.job_queue import JobQueue
+from core.main import run_scrape
+from core.events import capture, emit, since_ms, JOB_STARTED, JOB_FINISHED
+
+log = get_logger()
+
+DEFAULT_INTERVAL_MINUTES = 30
+DEFAULT_POLL_SECONDS = 5
+
+
+class Heartbeat(threading.Thread):
+    """Keeps worker_status fresh while a long scrape blocks the main loop."""
+
+    def __init__(self, path, every, next_run):
+        super().__init__(daemon=True)
+        self.path = path
+        self.every = every
+        self.next_run = next_run
+        self._done = threading.Event()
+
+    def run(self):
+        queue = JobQueue(self.path)
+        try:
+            while not self._done.wait(self.every):
+                queue.heartbeat("running", self.next_run)
+        finally:
+            queue.close()
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def serve(queue, interval=timedelta(minutes=DEFAULT_INTERVAL_MINUTES),
+          poll_seconds=DEFAULT_POLL_SECONDS, run_now=True, once=False):
+    """
+    Worker loop: queue a scheduled scrape every interval (None to only serve
+    requests), run queued jobs one at a time and record each run in the
+    history store, where the dashboard reads it. once=True exits after the
+    first job.
+    """
+    next_run = datetime.utcnow() if run_now else datetime.utcnow() + (interval or timedelta(0))
+    while True:
+        now = datetime.utcnow()
+        if interval and now >= next_run:
+            queue.enqueue("schedule")
+            next_run = now + interval
+
+        job = queue.claim()
+        if job is None:
+            if once:
+                return
+            queue.heartbeat("idle", next_run if interval else None)
+            time.sleep(poll_seconds)
+            continue
+
+        log.info(f"[WORKER] Running job {job['id']} ({job['reason']})")
+        queue.heartbeat("running", next_run if interval else None)
+        beat = Heartbeat(queue.path, poll_seconds, next_run if interval else None)
+        beat.start()
+        started = time.monotonic()
+        try:
+            # Every scraper log line and progress event of this job is
+            # published for the dashboard and `python -m core.events`
+            with capture(job["id"], queue.path):
+                emit(JOB_STARTED, f"Job {job['id']} started ({job['reason']})",
+                     targets=job["targets"])
+                outcome = run_scrape(job["targets"])
+                emit(JOB_FINISHED, f"Job {job['id']} {outcome['status']}: "
+                                   f"{outcome['total']} matches",
+                     elapsed_ms=since_ms(started), status=outcome["status"],
+                     total=outcome["total"], run_id=outcome["run_id"], metrics=outcome["metrics"])
+        except Exception as e:
+            # The job must never stay "running", or the dashboard refuses
+            # new requests until the worker restarts
+            log.error(f"[WORKER] Job {job['id']} crashed: {e}")
+            outcome = {"run_id": None, "total": 0, "status": "failed", "error": str(e), "metrics": None}
+        finally:
+            beat.stop()
+        queue.finish(job["id"], outcome["status"], run_id=outcome["run_id"],
+                     total_matches=outcome["total"], error=outcome["error"])
+        log.info(f"[WORKER] Job {job['id']} {outcome['status']}: "
+                 f"{outcome['total']} matches in run {outcome['run_id']}")
+        queue.heartbeat("idle", next_run if interval else None)
+        if once:
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Background scraper: runs queued and scheduled scrapes into the history store")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_MINUTES,
+                        help="minutes between scheduled scrapes, 0 to only serve requests")
+    parser.add_argument("--poll", type=float, default=DEFAULT_POLL_SECONDS,
+                        help="seconds between queue checks")
+    parser.add_argument("--no-initial-run", action="store_true",
+                        help="wait one interval before the first scheduled scrape")
+    parser.add_argument("--once", action="store_true",
+                        help="queue one scrape, run it and exit")
+    args = parser.parse_args()
+
+    queue = JobQueue()
+    if queue.worker_alive():
+        status = queue.worker_status()
+        if status["pid"] != os.getpid():
+            log.error(f"[WORKER] Another worker (pid {status['pid']}) is already running")
+            queue.close()
+            return
+    queue.fail_running()
+
+    interval = timedelta(minutes=args.interval) if args.interval > 0 else None
+    if args.once:
+        queue.enqueue("cli")
+    log.info(f"[WORKER] Started (pid {os.getpid()}), "
+             + (f"scraping every {args.interval:g} min" if interval else "serving requests only"))
+    try:
+        serve(queue, interval=None if args.once else interval, poll_seconds=args.poll,
+              run_now=not args.no_initial_run, once=args.once)
+    except KeyboardInterrupt:
+        log.info("[WORKER] Stopping")
+    finally:
+        queue.heartbeat("stopped")
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
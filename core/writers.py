@@ -0,0 +1,80 @@
+# core/writers.py
+
+import os
+import pandas as pd
+from core.utils import get_logger
+
+log = get_logger()
+
+# Comma-separated list of output backends, e.g. "csv,json,jsonl,parquet"
+DEFAULT_FORMATS = tuple(
+    f.strip() for f in os.environ.get("ODDSPORTAL_OUTPUT_FORMATS", "csv,json").split(",") if f.strip())
+
+PARQUET_ROOT = os.path.join("./output", "parquet")
+
+
+def normalize_odd(value):
+    """
+    Convert one odds string to decimal odds: "2.44" stays 2.44, American
+    "+150" becomes 2.5 and "-110" becomes 1.909, fractional "5/2" becomes 3.5.
+    Returns None for blanks and placeholders like "-".
+    """
+    if value is None:
+        return None
+    text = str(value).strip().replace(",", ".")
+    if not text or text == "-":
+        return None
+    try:
+        if text[0] in "+-" and len(text) > 1:
+            american = float(text)
+            if american > 0:
+                return round(1 + american / 100, 4)
+            return round(1 + 100 / -american, 4)
+        if "/" in text:
+            num, den = text.split("/", 1)
+            return round(1 + float(num) / float(den), 4)
+        return float(text)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def odds_columns(odds):
+    """Split an odds list into home/draw/away; two-way markets have no draw."""
+    values = [normalize_odd(o) for o in (odds or [])]
+    if len(values) == 2:
+        return {"odds_home": values[0], "odds_draw": None, "odds_away": values[1]}
+    values += [None] * (3 - len(values))
+    return {"odds_home": values[0], "odds_draw": values[1], "odds_away": values[2]}
+
+
+def parquet_table(matches):
+    """Arrow table for a batch of matches with odds as typed float columns."""
+    import pyarrow as pa
+
+    rows = []
+    for match in matches:
+        kickoff = pd.to_datetime(match.get("datetime") or None, errors="coerce", utc=True)
+        rows.append({
+            "datetime": None if pd.isna(kickoff) else kickoff,
+            "country": match.get("country"),
+            "league": match.get("league"),
+            "team1": match.get("team1"),
+            "team2": match.get("team2"),
+            **odds_columns(match.get("odds")),
+            "odds_raw": [str(o) for o in match.get("odds") or []],
+            "match_url": match.get("match_url"),
+        })
+
+    schema = pa.schema([
+        ("datetime", pa.timestamp("us", tz="UTC")),
+        ("country", pa.string()),
+        ("league", pa.string()),
+        ("team1", pa.string()),
+        ("team2", pa.string()),
+        ("odds_home", pa.float64()),
+        ("odds_draw", pa.float64()),
+        ("odds_away", pa.float64()),
+        ("odds_raw", pa.list_(pa.string())),
+        ("match_url", pa.string()),
+    ])
+    return pa.Table.from_pylist(rows, schema=schema)
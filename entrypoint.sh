@@ -0,0 +1,16 @@
+#!/bin/bash
+# Container entrypoint: the dashboard only queues scrapes, so the background
+# worker (core.worker) runs next to it and is restarted if it ever exits.
+
+cd "$(dirname "$0")"
+playwright install chromium
+
+(
+    while true; do
+        python -m core.worker
+        echo "[entrypoint] core.worker exited, restarting in 5s" >&2
+        sleep 5
+    done
+) &
+
+exec streamlit run app.py --server.port=8501 --server.address=0.0.0.0
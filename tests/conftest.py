@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import the app's modules as `core.*`, like the scripts do
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
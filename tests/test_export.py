@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+import zipfile
+
+from core.export import export_run
+from core.history_store import HistoryStore
+from core.jsonl import to_jsonl
+
+
+def match(sport, n, odds=("2.0", "3.0", "4.0")):
+    return {"match_url": f"https://example.com/{sport}/x/y/m-{n}/", "sport": sport,
+            "country": "England", "league": "Premier League", "team1": f"H{n}",
+            "team2": f"A{n}", "odds": list(odds), "datetime": "2026-10-16T18:30:00+00:00"}
+
+
+def make_history(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    history.start_run()
+    history.record("football", [match("football", 1), match("football", 2)])
+    history.record("tennis", [match("tennis", 3, odds=("1.5", "2.5"))])
+    history.finish_run(3)
+    return history
+
+
+def test_exports_the_full_card(tmp_path):
+    history = make_history(tmp_path)
+    run_id = history.latest_run_id()
+    path = export_run(run_id, history=history, export_dir=str(tmp_path / "exports"))
+
+    with zipfile.ZipFile(path) as zf:
+        names = sorted(n.rsplit("_", 2)[0] + "." + n.rsplit(".", 1)[1] for n in zf.namelist())
+        assert names == sorted(f"{p}_matches.{fmt}" for p in ("consolidated", "football", "tennis")
+                               for fmt in ("csv", "json", "jsonl"))
+        entry = {n.split("_")[0] + "." + n.rsplit(".", 1)[1]: n for n in zf.namelist()}
+        football = history.latest_matches(sport="football")
+        assert zf.read(entry["football.json"]).decode() == \
+            json.dumps(football, indent=2, ensure_ascii=False)
+        assert zf.read(entry["football.jsonl"]) == to_jsonl(football)
+        rows = list(csv.DictReader(io.StringIO(zf.read(entry["consolidated.csv"]).decode())))
+        assert [(r["Sport"], r["Team 1"]) for r in rows] == \
+            [("football", "H1"), ("football", "H2"), ("tennis", "H3")]
+        assert "Sport" not in zf.read(entry["tennis.csv"]).decode().splitlines()[0]
+
+    # Built once per run and reused
+    assert export_run(run_id, history=history, export_dir=str(tmp_path / "exports")) == path
+    history.close()
+
+
+def test_nothing_to_export(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"))
+    exports = str(tmp_path / "exports")
+    assert export_run(history=history, export_dir=exports) is None
+    history.start_run()
+    history.finish_run(0)
+    assert export_run(history.run_id, history=history, export_dir=exports) is None
+    # Unfinished runs are not exported either
+    history.start_run()
+    history.record("football", [match("football", 1)])
+    assert export_run(history.run_id, history=history, export_dir=exports) is None
+    history.close()
@@ -0,0 +1,35 @@
+from core.history_store import HistoryStore
+
+LISTING = "https://example.com/football/"
+
+
+def match(home, away, odds, url=LISTING):
+    return {"match_url": url, "sport": "football", "country": "England",
+            "league": "Premier League", "team1": home, "team2": away,
+            "odds": odds, "datetime": "2026-10-16T18:30:00+00:00"}
+
+
+def test_listing_url_rows_stay_distinct_across_batches(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    store.start_run()
+    store.record("football", [match("a", "b", ["1.5", "3.0", "5.0"]),
+                              match("c", "d", ["2.0", "3.0", "4.0"])])
+    store.record("football", [match("e", "f", ["2.5", "3.1", "2.9"])])
+    store.finish_run(3)
+
+    latest = {(m["team1"], m["team2"]): m["odds"] for m in store.latest_matches()}
+    assert latest == {("a", "b"): ["1.5", "3.0", "5.0"],
+                      ("c", "d"): ["2.0", "3.0", "4.0"],
+                      ("e", "f"): ["2.5", "3.1", "2.9"]}
+    store.close()
+
+
+def test_keys_reset_with_each_run(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"))
+    for odds in (["1.5", "3.0", "5.0"], ["1.6", "3.0", "4.8"]):
+        store.start_run()
+        store.record("football", [match("a", "b", odds, url=LISTING + "a-b/")])
+        store.finish_run(1)
+    assert [r["odds_raw"] for r in store.odds_history(LISTING + "a-b/")] == \
+        ['["1.5", "3.0", "5.0"]', '["1.6", "3.0", "4.8"]']
+    store.close()
@@ -0,0 +1,68 @@
+import os
+
+from core.html_parser import parse_listing_html
+from core.league_filter import LeagueGate, get_matcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LISTING = os.path.join(ROOT, "tests", "fixtures", "listing.html")
+BASE_URL = "https://www.oddsportal.com/football/"
+
+
+def listing_html():
+    with open(LISTING, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def test_parses_rows():
+    rows = parse_listing_html(listing_html(), BASE_URL)
+    assert [r["index"] for r in rows] == [0, 1, 2]
+    first = rows[0]
+    assert first["teams"] == ["Arsenal", "Chelsea"]
+    assert first["odds"] == ["2.10", "3.40", "3.50"]
+    assert first["time"] == "18:30"
+    assert first["match_link"] == \
+        "https://www.oddsportal.com/football/england/premier-league/arsenal-chelsea-AbCd1234/"
+    assert (first["country"], first["league"]) == ("England", "Premier League")
+    assert first["league_url"] == "https://www.oddsportal.com/football/england/premier-league/"
+
+
+def test_group_headers_carry_forward():
+    rows = parse_listing_html(listing_html(), BASE_URL)
+    # The second group has no headers of its own
+    second = rows[1]
+    assert (second["date_header"], second["country"], second["league"]) == \
+        ("Today, 16 Oct", "England", "Premier League")
+    assert second["odds"] == ["2.60", "-", "2.80"]
+    # No time cell, so the time is read from the row text
+    assert second["time"] == "20:45"
+    third = rows[2]
+    assert (third["date_header"], third["country"]) == ("Tomorrow, 17 Oct", "Bhutan")
+
+
+def test_keep_rejects_whole_groups():
+    seen = []
+
+    def keep(country, league):
+        seen.append((country, league))
+        return country == "Bhutan"
+
+    rows = parse_listing_html(listing_html(), BASE_URL, keep=keep)
+    assert [r["teams"] for r in rows] == [["Paro", "Thimphu City"]]
+    assert rows[0]["index"] == 0
+    assert seen == [("England", "Premier League")] * 2 + [("Bhutan", "Premier League")]
+
+
+def test_keep_with_league_gate():
+    gate = LeagueGate("football", get_matcher(os.path.join(ROOT, "config", "league_whitelist.json")))
+    rows = parse_listing_html(listing_html(), BASE_URL, keep=gate.allows_header)
+    assert [r["country"] for r in rows] == ["England", "England"]
+
+
+def test_rows_without_groups():
+    html = ('<div data-testid="game-row"><div data-testid="time-item">12:00</div>'
+            '<a title="A">A</a><a title="B">B</a>'
+            '<p data-testid="odd-container-default">1.50</p></div>')
+    rows = parse_listing_html(html, BASE_URL)
+    assert len(rows) == 1
+    assert rows[0]["teams"] == ["A", "B"]
+    assert rows[0]["country"] == "" and rows[0]["match_link"] == ""
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from core.job_queue import JobQueue
+
+
+def make_queue(tmp_path):
+    return JobQueue(str(tmp_path / "history.sqlite3"))
+
+
+def test_enqueue_never_stacks_jobs(tmp_path):
+    queue = make_queue(tmp_path)
+    first = queue.enqueue("dashboard")
+    assert first is not None
+    assert queue.enqueue("dashboard") is None
+    # Another connection (a second dashboard session) sees the same job
+    other = make_queue(tmp_path)
+    assert other.enqueue("schedule") is None
+    assert other.active()["id"] == first
+
+    job = queue.claim()
+    assert job["id"] == first
+    # Still active while running
+    assert queue.enqueue("dashboard") is None
+    queue.finish(first, "ok", run_id=7, total_matches=12)
+    assert queue.active() is None
+    assert queue.enqueue("dashboard") is not None
+    queue.close()
+    other.close()
+
+
+def test_claim_moves_the_oldest_job_to_running(tmp_path):
+    queue = make_queue(tmp_path)
+    assert queue.claim() is None
+    job_id = queue.enqueue("cli", targets=["football", "tennis"])
+    job = queue.claim()
+    assert job["id"] == job_id
+    assert job["targets"] == ["football", "tennis"]
+    assert queue.claim() is None
+    assert queue.active()["status"] == "running"
+
+    queue.fail_running()
+    failed = queue.jobs()[0]
+    assert failed["status"] == "failed" and failed["error"] == "worker restarted"
+    queue.close()
+
+
+def test_worker_alive(tmp_path):
+    queue = make_queue(tmp_path)
+    assert not queue.worker_alive()
+    next_run = datetime.utcnow() + timedelta(minutes=30)
+    queue.heartbeat("idle", next_run)
+    assert queue.worker_alive()
+    assert queue.worker_status()["next_run_at"] == next_run.isoformat()
+    assert not queue.worker_alive(stale_after=0)
+    queue.heartbeat("stopped")
+    assert not queue.worker_alive()
+    queue.close()
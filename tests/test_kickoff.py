@@ -0,0 +1,67 @@
+import datetime
+from datetime import timezone
+
+from core.kickoff import (kickoff_utc, parse_date_header, parse_kickoffs, parse_time,
+                          site_today, starting_within)
+
+TODAY = datetime.date(2026, 10, 16)
+
+
+def test_parse_date_header():
+    assert parse_date_header("Today, 16 Oct", TODAY) == TODAY
+    assert parse_date_header("Tomorrow, 17 Oct  - Play Offs", TODAY) == datetime.date(2026, 10, 17)
+    assert parse_date_header("Yesterday", TODAY) == datetime.date(2026, 10, 15)
+    assert parse_date_header("05 Jul 2025", TODAY) == datetime.date(2025, 7, 5)
+    assert parse_date_header("", TODAY) is None
+    assert parse_date_header("Play Offs", TODAY) is None
+
+
+def test_parse_date_header_picks_the_closest_year():
+    assert parse_date_header("Friday, 02 Jan", datetime.date(2026, 12, 30)) == datetime.date(2027, 1, 2)
+    assert parse_date_header("31 Dec", datetime.date(2027, 1, 1)) == datetime.date(2026, 12, 31)
+
+
+def test_parse_time():
+    assert parse_time("18:30") == datetime.time(18, 30)
+    assert parse_time("6:30 PM") == datetime.time(18, 30)
+    assert parse_time("12:05 am") == datetime.time(0, 5)
+    for text in ("Live", "FT", "45'", "", None, "25:00"):
+        assert parse_time(text) is None
+
+
+def test_kickoff_utc():
+    assert kickoff_utc("Today, 16 Oct", "18:30", TODAY, "UTC") == \
+        datetime.datetime(2026, 10, 16, 18, 30, tzinfo=timezone.utc)
+    # British Summer Time is UTC+1
+    assert kickoff_utc("Tomorrow, 17 Oct", "00:30", TODAY, "Europe/London") == \
+        datetime.datetime(2026, 10, 16, 23, 30, tzinfo=timezone.utc)
+    # Rows without a date header kick off today
+    assert kickoff_utc("", "09:00", TODAY, "UTC").date() == TODAY
+    assert kickoff_utc("Today, 16 Oct", "Live", TODAY, "UTC") is None
+
+
+def test_site_today():
+    late = datetime.datetime(2026, 10, 16, 23, 30)
+    assert site_today(late, "UTC") == TODAY
+    assert site_today(late, "Europe/Berlin") == datetime.date(2026, 10, 17)
+
+
+def test_parse_kickoffs():
+    rows = [{"date_header": "Today, 16 Oct", "time": "18:30"},
+            {"date_header": "Today, 16 Oct", "time": "18:30"},
+            {"date_header": None, "time": "FT"}]
+    now = datetime.datetime(2026, 10, 16, 12, 0)
+    first, second, third = parse_kickoffs(rows, now=now, tz="UTC")
+    assert first == second == datetime.datetime(2026, 10, 16, 18, 30, tzinfo=timezone.utc)
+    assert third is None
+
+
+def test_starting_within():
+    now = datetime.datetime(2026, 10, 16, 12, 0, tzinfo=timezone.utc)
+    matches = [{"datetime": "2026-10-16T12:30:00+00:00"},
+               {"datetime": "2026-10-16T14:00:00+00:00"},
+               {"datetime": "2026-10-16T11:00:00+00:00"},
+               {"datetime": "2026-10-16T12:30:00"},  # naive, skipped
+               {"datetime": ""}]
+    soon = starting_within(matches, datetime.timedelta(hours=1), now=now)
+    assert soon == [matches[0]]
@@ -0,0 +1,111 @@
+import csv
+import os
+import random
+
+from core.filter_soccer_leagues import filter_soccer
+from core.league_filter import LeagueGate, LeagueMatcher, get_matcher, league_gate, normalize_name
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WHITELIST = os.path.join(ROOT, "config", "league_whitelist.json")
+SAMPLE_CSV = os.path.join(ROOT, "format", "oddsportal.csv")
+
+
+def sample_headers():
+    """(country, league) group headers from a captured listing."""
+    with open(SAMPLE_CSV, newline="", encoding="utf-8") as f:
+        return {(r["truncate 2"], r["truncate 3"]) for r in csv.DictReader(f) if r["truncate 3"]}
+
+
+def test_normalize_name():
+    assert normalize_name("  Süper  Lig! ") == "super lig"
+    assert normalize_name(None) == ""
+
+
+def test_qualified_entries_only_match_their_country():
+    matcher = LeagueMatcher({"sports": {"football": {
+        "tier1": ["England: Premier League"], "tier2": ["Scotland: Premiership"]}}})
+    assert matcher.tier_of("football", "Premier League", "England") == 1
+    assert matcher.tier_of("football", "Premier League", "Bhutan") is None
+    assert matcher.tier_of("football", "Premier League") is None
+    assert matcher.tier_of("football", "Premiership", "Scotland") == 2
+    assert matcher.tier_of("football", "Premiership Women", "Northern Ireland") is None
+
+
+def test_aliases_resolve_on_both_sides():
+    matcher = LeagueMatcher({"aliases": {"EPL": "Premier League"},
+                             "sports": {"football": {"tier1": ["England: EPL"]}}})
+    assert matcher.tier_of("football", "Premier League", "England") == 1
+    assert matcher.tier_of("football", "epl", "england") == 1
+
+
+def test_contains_matches_inside_longer_names():
+    config = {"sports": {"football": {"tier1": ["Champions League"]}}}
+    assert LeagueMatcher(config).tier_of("football", "Champions League - Qualification") is None
+    assert LeagueMatcher(config, contains=True).tier_of(
+        "football", "Champions League - Qualification") == 1
+    # Whole words only
+    assert LeagueMatcher(config, contains=True).tier_of("football", "Champions Leagues") is None
+
+
+def test_shipped_whitelist_against_captured_headers():
+    matcher = get_matcher(WHITELIST)
+    kept = {h for h in sample_headers() if matcher.tier_of("football", h[1], h[0]) is not None}
+    # The capture has no top-tier leagues; other countries' "Premier League"
+    # and "Premiership Women" must not slip through
+    assert kept == {("USA", "MLS")}
+    assert matcher.tier_of("football", "Premier League", "England") == 1
+    assert matcher.tier_of("football", "Bundesliga", "Austria") is None
+    assert matcher.tier_of("football", "Bundesliga", "Germany") == 1
+    assert matcher.tier_of("football", "Serie A", "Brazil") is None
+    assert matcher.tier_of("football", "Premiership", "Scotland") == 2
+
+
+def test_filter_soccer_matches_the_exact_name_filter_on_random_input():
+    whitelist = ["Premier League", "LaLiga", "Bundesliga", "Serie A", "Eredivisie"]
+    allowed = {name.strip().lower() for name in whitelist}
+    names = whitelist + [league for _, league in sample_headers()]
+    rng = random.Random(17)
+
+    def variant(name):
+        name = "".join(c.upper() if rng.random() < 0.3 else c for c in name)
+        return " " * rng.randint(0, 2) + name + " " * rng.randint(0, 2)
+
+    matches = [{"sport": rng.choice(["football", "football", "basketball"]),
+                "league": variant(rng.choice(names)), "country": ""} for _ in range(500)]
+    expected = [m for m in matches
+                if m["sport"] != "football" or m["league"].strip().lower() in allowed]
+    assert filter_soccer(matches, whitelist=whitelist) == expected
+
+
+def gate_matcher():
+    return LeagueMatcher({"sports": {"football": {
+        "tier1": ["England: Premier League"], "tier2": ["Netherlands: Eredivisie"]}}})
+
+
+def test_league_gate_decides_each_header_once():
+    gate = LeagueGate("football", gate_matcher())
+    assert gate.allows_header("England", "Premier League")
+    assert not gate.allows_header("Bhutan", "Premier League")
+    # Rows without a league header are kept
+    assert gate.allows_header("", "")
+    assert gate.allows_header(None, None)
+    assert len(gate._decisions) == 3
+
+
+def test_league_gate_max_tier():
+    gate = LeagueGate("football", gate_matcher(), max_tier=1)
+    assert gate.allows_header("England", "Premier League")
+    assert not gate.allows_header("Netherlands", "Eredivisie")
+
+
+def test_league_gate_selector_keys():
+    gate = LeagueGate("football", gate_matcher())
+    gate.decide([["England", "Premier League"], ["Bhutan", "Premier League"],
+                 ["England", "Premier League"]])
+    assert gate.selector_keys() == {"leagueKeys": ["England|Premier League"],
+                                    "skipKeys": ["Bhutan|Premier League"]}
+
+
+def test_league_gate_only_for_whitelisted_sports():
+    assert league_gate("football", path=WHITELIST) is not None
+    assert league_gate("curling", path=WHITELIST) is None
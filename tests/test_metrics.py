@@ -0,0 +1,104 @@
+import asyncio
+import json
+
+import pytest
+
+from core.metrics import RunMetrics, collecting, current, percentile, span, to_prometheus
+
+
+def test_percentile_is_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 0.5) == 3
+    assert percentile(values, 0.95) == 5
+    assert percentile(values, 0.0) == 1
+    assert percentile([7], 0.95) == 7
+    assert percentile(list(range(1, 101)), 0.95) == 95
+
+
+def test_spans_only_record_inside_collecting():
+    with span("goto", "football") as outside:
+        pass
+    assert outside.elapsed_ms is not None
+    assert current() is None
+
+    metrics = RunMetrics(1)
+    with collecting(metrics):
+        assert current() is metrics
+        with span("goto", "football"):
+            pass
+        with pytest.raises(ValueError):
+            with span("goto", "football"):
+                raise ValueError("boom")
+    assert current() is None
+    assert [failed for _, failed in metrics.spans[("goto", "football")]] == [False, True]
+
+
+def test_span_decorates_sync_and_async_functions():
+    @span("parse")
+    def parse():
+        return 1
+
+    @span("fetch", "tennis")
+    async def fetch():
+        return 2
+
+    metrics = RunMetrics()
+    with collecting(metrics):
+        assert parse() == 1
+        assert asyncio.run(fetch()) == 2
+    assert set(metrics.spans) == {("parse", None), ("fetch", "tennis")}
+
+
+def test_report_per_run_and_sport():
+    metrics = RunMetrics(3)
+    for ms in (100, 200, 300, 400):
+        metrics.observe("goto", ms, "football")
+    metrics.observe("goto", 50, "tennis", failed=True)
+    metrics.observe("target", 2000, "football")
+    metrics.observe("write_consolidated", 10)  # shared by all sports
+    metrics.add_rows("football", 40)
+    metrics.add_bytes("football", 1000)
+    metrics.add_bytes(None, 500)
+    metrics.duration_s = 4.0
+
+    report = metrics.report()
+    assert report["rows"] == 40 and report["rows_per_second"] == 10.0
+    assert report["bytes_written"] == 1500
+    assert report["stages"]["goto"] == {"count": 5, "errors": 1, "total_ms": 1050,
+                                        "p50_ms": 200, "p95_ms": 400, "max_ms": 400}
+    football = report["sports"]["football"]
+    # Over the sport's own scrape time, not the whole run's
+    assert football["rows_per_second"] == 20.0
+    assert football["stages"]["goto"]["p50_ms"] == 200
+    assert report["sports"]["tennis"]["rows_per_second"] is None
+    assert set(report["sports"]) == {"football", "tennis"}
+
+
+def test_prometheus_output():
+    metrics = RunMetrics(3)
+    metrics.observe("goto", 1500, "football")
+    metrics.observe("write_consolidated", 250)
+    metrics.add_rows("football", 10)
+    metrics.duration_s = 2.0
+    text = to_prometheus(metrics.report(), metrics.spans)
+    lines = text.splitlines()
+
+    assert 'oddsportal_stage_duration_seconds{stage="goto",sport="football",quantile="0.5"} 1.500' in lines
+    assert 'oddsportal_stage_duration_seconds_count{stage="goto",sport="football"} 1' in lines
+    assert 'oddsportal_stage_duration_seconds_sum{stage="write_consolidated"} 0.250' in lines
+    assert "oddsportal_run_rows 10" in lines
+    assert 'oddsportal_run_rows{sport="football"} 10' in lines
+    assert "# TYPE oddsportal_run_duration_seconds gauge" in lines
+    assert text.endswith("\n")
+
+
+def test_write(tmp_path):
+    metrics = RunMetrics(5)
+    metrics.observe("goto", 100, "football")
+    metrics.finish()
+    path = metrics.write(str(tmp_path))
+    assert path == str(tmp_path / "run_5.json")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["run_id"] == 5
+    assert (tmp_path / "oddsportal.prom").exists()
+    assert not (tmp_path / "oddsportal.prom.tmp").exists()
@@ -0,0 +1,94 @@
+import asyncio
+import csv
+
+import pytest
+
+from core.pipeline import CsvSink, JsonArraySink, Sink, run_pipeline
+
+
+class RecordingSink(Sink):
+    def __init__(self, fail_on_write=False):
+        self.batches = []
+        self.closed = None
+        self.fail_on_write = fail_on_write
+
+    async def write(self, batch):
+        if self.fail_on_write:
+            raise ValueError("sink broke")
+        self.batches.append(batch)
+
+    async def close(self, failed=False):
+        self.closed = {"failed": failed}
+
+
+class Source:
+    """Async iterator over matches that can fail after a number of them."""
+
+    def __init__(self, count, fail_after=None):
+        self.count = count
+        self.fail_after = fail_after
+        self.closed = False
+
+    def __aiter__(self):
+        return self._gen()
+
+    async def _gen(self):
+        for i in range(self.count):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("page crashed")
+            yield {"id": i, "home": f"H{i}", "away": f"A{i}"}
+
+    async def aclose(self):
+        self.closed = True
+
+
+def test_streams_batches_into_sinks(tmp_path):
+    recorder = RecordingSink()
+    csv_sink = CsvSink(str(tmp_path / "matches.csv"))
+    total = asyncio.run(run_pipeline(Source(5), [recorder, csv_sink], batch_size=2))
+
+    assert total == 5
+    assert [len(b) for b in recorder.batches] == [2, 2, 1]
+    assert recorder.closed == {"failed": False}
+    assert csv_sink.saved_path == str(tmp_path / "matches.csv")
+    with open(csv_sink.saved_path, newline="", encoding="utf-8") as f:
+        assert [r["id"] for r in csv.DictReader(f)] == ["0", "1", "2", "3", "4"]
+    assert not (tmp_path / "matches.csv.tmp").exists()
+
+
+def test_source_failure_discards_partial_files(tmp_path):
+    recorder = RecordingSink()
+    csv_sink = CsvSink(str(tmp_path / "matches.csv"))
+    json_sink = JsonArraySink(str(tmp_path / "matches.json"))
+    source = Source(10, fail_after=5)
+
+    with pytest.raises(RuntimeError, match="page crashed"):
+        asyncio.run(run_pipeline(source, [recorder, csv_sink, json_sink], batch_size=2))
+
+    assert source.closed
+    assert recorder.closed == {"failed": True}
+    assert csv_sink.saved_path is None and json_sink.saved_path is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sink_failure_stops_the_source(tmp_path):
+    broken = RecordingSink(fail_on_write=True)
+    csv_sink = CsvSink(str(tmp_path / "matches.csv"))
+    source = Source(1000)
+
+    with pytest.raises(ValueError, match="sink broke"):
+        asyncio.run(run_pipeline(source, [broken, csv_sink], batch_size=2, max_pending=1))
+
+    assert source.closed
+    assert broken.closed == {"failed": True}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_close_errors_do_not_mask_the_result(tmp_path):
+    class BadClose(RecordingSink):
+        async def close(self, failed=False):
+            raise OSError("disk full")
+
+    recorder = RecordingSink()
+    assert asyncio.run(run_pipeline(Source(3), [BadClose(), recorder])) == 3
+    assert recorder.closed == {"failed": False}
@@ -0,0 +1,155 @@
+import asyncio
+import http.client
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+from core.proxy_manager import ProxyManager
+from utils.proxy_pool import load_proxies
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"User-agent: *\n"
+        self.send_response(200 if self.path == "/robots.txt" else 404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ForwardProxyHandler(BaseHTTPRequestHandler):
+    """Plain HTTP forward proxy: relays absolute-URI GETs to the origin."""
+
+    def do_GET(self):
+        target = urlsplit(self.path)
+        conn = http.client.HTTPConnection(target.hostname, target.port, timeout=5)
+        conn.request("GET", target.path or "/")
+        upstream = conn.getresponse()
+        body = upstream.read()
+        conn.close()
+        self.server.relayed += 1
+        self.send_response(upstream.status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.relayed = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def dead_port():
+    """A local port nothing listens on."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def local_proxy():
+    origin = serve(OriginHandler)
+    proxy = serve(ForwardProxyHandler)
+    yield f"http://127.0.0.1:{origin.server_port}/robots.txt", proxy
+    for server in (proxy, origin):
+        server.shutdown()
+        server.server_close()
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_validate_against_local_proxy(local_proxy):
+    validate_url, proxy = local_proxy
+    good = f"http://127.0.0.1:{proxy.server_port}"
+    dead = f"http://127.0.0.1:{dead_port()}"
+    manager = ProxyManager([good, dead], validate_url=validate_url, validate_timeout=5)
+
+    assert asyncio.run(manager.validate()) == 1
+    assert proxy.relayed == 1
+    assert manager.health[good].successes == 1
+    assert manager.health[good].latency is not None
+    # Never answered, so it is quarantined on its first failure
+    assert manager.health[dead].strikes == 1
+    assert [h.url for h in manager.available()] == [good]
+    assert manager.choose() == good
+
+
+def test_quarantine_backs_off_and_evicts(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr("core.proxy_manager.time.monotonic", clock)
+    url = "http://127.0.0.1:1"
+    manager = ProxyManager([url], quarantine_base=60, quarantine_max=200,
+                           failures_to_quarantine=2, max_strikes=4)
+    health = manager.health[url]
+    manager.report_success(url, 0.1)
+
+    backoffs = []
+    for _ in range(3):
+        manager.report_failure(url)
+        assert health.available(clock.now)  # one failure is tolerated
+        manager.report_failure(url)
+        assert not health.available(clock.now)
+        backoffs.append(health.quarantined_until - clock.now)
+        clock.now = health.quarantined_until
+        assert manager.choose() == url
+    assert backoffs == [60, 120, 200]  # doubles, capped at quarantine_max
+
+    manager.report_failure(url)
+    manager.report_failure(url)
+    assert health.evicted
+    assert manager.choose() is None
+    manager.allow_direct = False
+    with pytest.raises(RuntimeError):
+        manager.choose()
+
+
+def test_success_resets_consecutive_failures():
+    url = "http://127.0.0.1:1"
+    manager = ProxyManager([url], failures_to_quarantine=2)
+    manager.report_success(url, 0.1)
+    for _ in range(3):
+        manager.report_failure(url)
+        manager.report_success(url, 0.1)
+    assert manager.health[url].strikes == 0
+
+
+def test_from_config(tmp_path):
+    path = tmp_path / "proxies.json"
+    path.write_text(json.dumps({"enabled": False, "proxies": ["http://127.0.0.1:1"]}))
+    assert ProxyManager.from_config(str(path)) is None
+    path.write_text(json.dumps({"enabled": True, "proxies": []}))
+    assert ProxyManager.from_config(str(path)) is None
+    path.write_text(json.dumps({"enabled": True, "proxies": ["http://127.0.0.1:1"],
+                                "max_strikes": 3, "allow_direct": False}))
+    manager = ProxyManager.from_config(str(path))
+    assert list(manager.health) == ["http://127.0.0.1:1"]
+    assert manager.max_strikes == 3 and not manager.allow_direct
+
+
+def test_proxy_pool_honours_enabled(tmp_path):
+    path = tmp_path / "proxies.json"
+    path.write_text(json.dumps({"enabled": False, "proxies": ["http://127.0.0.1:1"]}))
+    assert load_proxies(str(path)) == []
+    path.write_text(json.dumps({"enabled": True, "proxies": []}))
+    assert load_proxies(str(path)) == []
+    path.write_text(json.dumps({"enabled": True, "proxies": ["http://127.0.0.1:1"]}))
+    assert load_proxies(str(path)) == ["http://127.0.0.1:1"]
+    assert load_proxies(str(tmp_path / "missing.json")) == []
@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+from core.scheduler import HostRateLimiter, Job, run_jobs
+
+
+def job(name, run, url="https://www.oddsportal.com/", timeout=5.0):
+    return Job(name=name, url=url, run=run, timeout=timeout)
+
+
+def test_failures_and_timeouts_are_isolated():
+    async def ok():
+        await asyncio.sleep(0.01)
+        return 3
+
+    async def broken():
+        raise ValueError("no rows")
+
+    async def hangs():
+        await asyncio.sleep(10)
+
+    done = []
+    results = asyncio.run(run_jobs(
+        [job("a", ok), job("b", broken), job("c", hangs, timeout=0.05), job("d", ok)],
+        host_interval=0, on_done=lambda j, outcome: done.append(j.name)))
+
+    assert [r.name for r in results] == ["a", "b", "c", "d"]
+    assert [r.ok for r in results] == [True, False, False, True]
+    assert results[0].result == 3 and results[3].result == 3
+    assert isinstance(results[1].error, ValueError)
+    assert isinstance(results[2].error, TimeoutError)
+    assert results[2].elapsed < 1
+    assert sorted(done) == ["a", "b", "c", "d"]
+
+
+def test_concurrency_cap():
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    asyncio.run(run_jobs([job(str(i), work) for i in range(8)],
+                         max_concurrency=3, host_interval=0))
+    assert peak == 3
+
+
+def test_host_starts_are_spaced_out():
+    starts = {}
+
+    async def work():
+        return None
+
+    jobs = [job(f"op{i}", work) for i in range(3)] + \
+        [job("other", work, url="https://example.com/")]
+    began = time.monotonic()
+    asyncio.run(run_jobs(jobs, max_concurrency=4, host_interval=0.05,
+                         on_start=lambda j: starts.setdefault(j.name, time.monotonic() - began)))
+
+    assert starts["op1"] - starts["op0"] >= 0.04
+    assert starts["op2"] - starts["op1"] >= 0.04
+    # Another host is not held back by the first one's spacing
+    assert starts["other"] < 0.04
+
+
+def test_rate_limiter_without_interval_never_sleeps():
+    async def go():
+        limiter = HostRateLimiter(0)
+        began = time.monotonic()
+        for _ in range(5):
+            await limiter.wait("www.oddsportal.com")
+        return time.monotonic() - began
+
+    assert asyncio.run(go()) < 0.05
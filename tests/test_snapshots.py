@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from core.pipeline import JsonlSink, SnapshotSink, run_pipeline
+from core.snapshots import SnapshotStore, match_key, write_deltas
+
+
+def match(n, odds=("2.0", "3.0", "4.0"), url=None):
+    return {"match_url": url or f"https://example.com/football/x/y/m-{n}/",
+            "team1": f"H{n}", "team2": f"A{n}", "odds": list(odds),
+            "datetime": "2026-10-16T18:30:00+00:00"}
+
+
+def test_match_key_disambiguates_shared_urls():
+    listing = "https://example.com/football/"
+    taken = {listing: {}}
+    assert match_key(match(1, url=listing)) == listing
+    assert match_key(match(1, url=listing), taken) == f"{listing}#H1|A1"
+
+
+def test_apply_reports_new_changed_and_removed(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    first = store.apply("football", [match(1), match(2)])
+    assert len(first["new"]) == 2 and not first["changed"] and not first["removed"]
+
+    second = store.apply("football", [match(1, odds=("2.1", "3.0", "4.0")), match(3)])
+    assert [m["team1"] for m in second["new"]] == ["H3"]
+    assert second["changed"][0]["previous_odds"] == ["2.0", "3.0", "4.0"]
+    assert [m["team1"] for m in second["removed"]] == ["H2"]
+
+    assert store.apply("football", [match(1, odds=("2.1", "3.0", "4.0")), match(3)]) == \
+        {"new": [], "changed": [], "removed": []}
+
+
+def test_save_writes_only_changed_scopes(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.apply("football", [match(1)])
+    store.apply("tennis", [match(2)])
+    store.save()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["football.json", "tennis.json"]
+
+    reloaded = SnapshotStore(str(tmp_path))
+    assert set(reloaded.state) == {"football", "tennis"}
+    reloaded.apply("football", [match(1)])
+    reloaded.apply("tennis", [match(2, odds=("1.5", "2.5"))])
+    assert reloaded._dirty == {"tennis"}
+
+
+def test_incomplete_end_keeps_previous_state(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.apply("football", [match(1), match(2), match(3)])
+    store.run_deltas.clear()
+
+    store.begin("football")
+    moved = store.observe("football", [match(1, odds=("9.0", "3.0", "4.0")),
+                                       match(2, odds=("8.0", "3.0", "4.0"))])
+    assert len(moved) == 2
+    delta = store.end("football", complete=False)
+    assert not delta["removed"]
+    assert "football" not in store.run_deltas
+
+    # The changes seen before the failure are reported again by the next run
+    again = store.apply("football", [match(1, odds=("9.0", "3.0", "4.0")),
+                                     match(2, odds=("8.0", "3.0", "4.0")), match(3)])
+    assert [m["team1"] for m in again["changed"]] == ["H1", "H2"]
+
+
+def test_failed_stream_leaves_no_changes_file_and_no_seen_state(tmp_path):
+    store = SnapshotStore(str(tmp_path / "state"))
+    store.apply("football", [match(1), match(2)])
+
+    async def source():
+        yield match(1, odds=("9.0", "3.0", "4.0"))
+        raise RuntimeError("page crashed")
+
+    changes = JsonlSink(str(tmp_path / "football_changes.jsonl"))
+    sink = SnapshotSink(store, "football", changed_sinks=[changes])
+    try:
+        asyncio.run(run_pipeline(source(), [sink], batch_size=1))
+    except RuntimeError:
+        pass
+    assert not (tmp_path / "football_changes.jsonl").exists()
+    assert store.state["football"][match_key(match(1))]["odds"] == ["2.0", "3.0", "4.0"]
+
+
+def test_write_deltas(tmp_path):
+    assert write_deltas({}, str(tmp_path)) is None
+    path = write_deltas({"football": {"new": [match(1)], "changed": [], "removed": []}},
+                        str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["scopes"]["football"]["new"][0]["team1"] == "H1"
@@ -0,0 +1,36 @@
+import sqlite3
+
+import core.main
+import core.worker
+from core.job_queue import JobQueue
+from core.worker import serve
+
+
+def locked_store(*args, **kwargs):
+    raise sqlite3.OperationalError("database is locked")
+
+
+def test_store_errors_fail_the_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(core.main, "HistoryStore", locked_store)
+    outcome = core.main.run_scrape()
+    assert outcome["status"] == "failed"
+    assert outcome["error"] == "database is locked"
+    assert outcome["run_id"] is None
+
+
+def test_crashed_job_is_finished_as_failed(tmp_path, monkeypatch):
+    def crash(targets):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(core.worker, "run_scrape", crash)
+    queue = JobQueue(str(tmp_path / "history.sqlite3"))
+    job_id = queue.enqueue("dashboard")
+    serve(queue, interval=None, poll_seconds=0.01, once=True)
+
+    job = next(j for j in queue.jobs() if j["id"] == job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "database is locked"
+    assert queue.active() is None
+    assert queue.enqueue("dashboard") is not None
+    queue.close()
@@ -0,0 +1,33 @@
+import pytest
+
+from core.writers import normalize_odd, odds_columns
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2.44", 2.44),
+    ("2,44", 2.44),
+    (" 1.5 ", 1.5),
+    (3, 3.0),
+    ("+150", 2.5),
+    ("-110", 1.9091),
+    ("-200", 1.5),
+    ("5/2", 3.5),
+    ("1/4", 1.25),
+    ("-", None),
+    ("", None),
+    (None, None),
+    ("n/a", None),
+    ("1/0", None),
+])
+def test_normalize_odd(value, expected):
+    assert normalize_odd(value) == expected
+
+
+def test_odds_columns():
+    assert odds_columns(["2.10", "3.40", "3.50"]) == \
+        {"odds_home": 2.1, "odds_draw": 3.4, "odds_away": 3.5}
+    # Two-way markets have no draw
+    assert odds_columns(["+150", "-200"]) == \
+        {"odds_home": 2.5, "odds_draw": None, "odds_away": 1.5}
+    assert odds_columns(["1.80"]) == {"odds_home": 1.8, "odds_draw": None, "odds_away": None}
+    assert odds_columns(None) == {"odds_home": None, "odds_draw": None, "odds_away": None}
@@ -1,15 +1,20 @@
 # utils/proxy_pool.py
 
+import json
 import random
 
-# Sample free proxies (rotate often or expand from proxy list APIs)
-FREE_PROXIES = [
-    "http://190.61.88.147:8080",
-    "http://138.128.91.65:8000",
-    "http://51.81.82.175:3128",
-    "http://103.167.68.25:8080",
-    "http://64.225.8.132:9981"
-]
+def load_proxies(path="config/proxies.json"):
+    """Configured proxies, or [] when proxies are disabled or not configured."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cfg = json.load(f)
+    except Exception:
+        return []
+    if not cfg.get("enabled", False):
+        return []
+    return cfg.get("proxies") or []
 
 def get_random_proxy():
-    return random.choice(FREE_PROXIES)
+    # Unvalidated pick, None to go direct; scrapers use core.proxy_manager.ProxyManager instead
+    proxies = load_proxies()
+    return random.choice(proxies) if proxies else None